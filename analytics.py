@@ -0,0 +1,233 @@
+"""Columnar store of hand histories with vectorized player statistics."""
+import argparse
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from cards import cards_to_mask, index_card
+from evaluator import evaluate_mask, hand_category
+from history import ACTION_CODE, HEADER, LENGTH, decode
+from poker import ALL_IN, BET, CALL, FOLD, RAISE, SCORE_RANK
+
+# Column names and dtypes of each table; every column is one flat file
+SEAT_COLUMNS = {
+    "hand": np.int64,  # Hand number within the store
+    "player": np.uint32,  # Recorded player ID
+    "position": np.uint8,  # Seats left of the button, 0 for the button
+    "seats": np.uint8,  # Players dealt into the hand
+    "vpip": np.bool_,  # Put chips in voluntarily preflop
+    "pfr": np.bool_,  # Raised preflop
+    "aggressive": np.uint16,  # Bets and raises after the preflop
+    "passive": np.uint16,  # Calls after the preflop
+    "showdown": np.bool_,  # Still in the hand when it was settled against others
+    "category": np.uint8,  # SCORE_RANK category at showdown, 0 otherwise
+    "invested": np.uint32,  # Chips put into the pots
+    "payout": np.uint32,  # Chips won from the pots
+}
+ACTION_COLUMNS = {
+    "hand": np.int64,
+    "player": np.uint32,
+    "position": np.uint8,
+    "street": np.uint8,  # Betting round, 0 for the preflop to 3 for the river
+    "action": np.uint8,  # Action code from history.ACTION_CODE
+    "amount": np.uint32,  # Player's total bet after the action
+}
+TABLES = {"seats": SEAT_COLUMNS, "actions": ACTION_COLUMNS}
+
+BATCH_SIZE = 100_000  # Hands converted before the columns are appended to disk
+VOLUNTARY = {CALL, BET, RAISE, ALL_IN}  # Preflop actions that count towards VPIP when they add chips
+AGGRESSIVE = {BET, RAISE, ALL_IN}
+
+
+class PlayerStats(NamedTuple):
+    """Aggregates per recorded player ID, one array entry per player."""
+    player: np.ndarray  # Recorded player IDs, ascending
+    hands: np.ndarray  # Hands dealt
+    vpip: np.ndarray  # Fraction of hands with a voluntary preflop call or raise
+    pfr: np.ndarray  # Fraction of hands with a preflop raise
+    aggression: np.ndarray  # Postflop bets and raises per call, inf without calls, nan without either
+    showdown_win: np.ndarray  # Fraction of showdowns that won chips, nan without showdowns
+    net: np.ndarray  # Chips won minus chips invested
+
+
+def hand_rows(number: int, payload: bytes) -> tuple[list, list]:
+    """Return the seat rows and action rows of one encoded hand record."""
+    record = decode(payload)
+    seats = len(record.seats)
+    board = cards_to_mask(index_card(index) for index in record.board)
+
+    # Blinds are posted before any action: small blind left of the button, then big blind
+    small_blind = (record.button + 1) % seats
+    street_bet = [[0] * seats for _ in range(4)]  # Each player's bet at the end of every street
+    street_bet[0][small_blind] = 1
+    if seats > 2:
+        street_bet[0][(small_blind + 1) % seats] = 2
+    blinds = list(street_bet[0])  # Chips each seat posted before acting
+    folded = [False] * seats
+    vpip, pfr = [False] * seats, [False] * seats
+    aggressive, passive = [0] * seats, [0] * seats
+
+    actions = []
+    for seat, action, amount, street in record.actions:
+        position = (seat - record.button) % seats
+        actions.append((number, record.seats[seat].player_id, position, street,
+                        ACTION_CODE[action], amount))
+        street_bet[street][seat] = amount
+        if action == FOLD:
+            folded[seat] = True
+        elif street == 0:
+            vpip[seat] |= action in VOLUNTARY and amount > blinds[seat]  # Not checking a blind
+            pfr[seat] |= action in (RAISE, ALL_IN)
+        elif action in AGGRESSIVE:
+            aggressive[seat] += 1
+        elif action == CALL:
+            passive[seat] += 1
+
+    contested = folded.count(False) > 1  # A lone player left takes the pot without a showdown
+    rows = []
+    for seat, (player_id, hand_mask, _, payout) in enumerate(record.seats):
+        showdown = contested and not folded[seat]
+        category = hand_category(evaluate_mask(hand_mask | board)) if showdown else 0
+        rows.append((number, player_id, (seat - record.button) % seats, seats, vpip[seat],
+                     pfr[seat], aggressive[seat], passive[seat], showdown, category,
+                     sum(bets[seat] for bets in street_bet), payout))
+    return rows, actions
+
+
+class HandStore:
+    """Directory of memory-mapped columns built from one hand history file.
+
+    ingest reads only the records appended since the last call, so the
+    store stays current as a game keeps recording. Columns are opened with
+    np.memmap and every statistic is a vectorized reduction over them.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Open the store in the directory, creating it if needed."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.state_path = os.path.join(directory, "state.json")
+        self.state = {"offset": 0, "hands": 0}  # Bytes of history read and hands stored
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as file:
+                self.state = json.load(file)
+        self.refresh()
+
+    def path(self, table: str, name: str) -> str:
+        """Return the file path of one column."""
+        return os.path.join(self.directory, f"{table}.{name}.bin")
+
+    def refresh(self) -> None:
+        """Map every column as it is now on disk."""
+        self.columns = {}
+        for table, columns in TABLES.items():
+            for name, dtype in columns.items():
+                path = self.path(table, name)
+                if os.path.exists(path) and os.path.getsize(path):
+                    self.columns[table, name] = np.memmap(path, dtype=dtype, mode="r")
+                else:
+                    self.columns[table, name] = np.empty(0, dtype=dtype)
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """Return one column of the seats or actions table."""
+        return self.columns[table, name]
+
+    def append(self, table: str, rows: list) -> None:
+        """Append rows of a table to the end of its column files."""
+        if not rows:
+            return
+        for name, values in zip(TABLES[table], zip(*rows)):
+            with open(self.path(table, name), "ab") as file:
+                file.write(np.array(values, dtype=TABLES[table][name]).tobytes())
+
+    def ingest(self, history_path: str) -> int:
+        """Add the hands appended to the history file since the last ingest and return their number."""
+        offset, number = self.state["offset"], self.state["hands"]
+        start = number
+        seat_rows, action_rows = [], []
+        with open(history_path, "rb") as file:
+            file.seek(offset)
+            while True:
+                prefix = file.read(LENGTH.size)
+                if len(prefix) < LENGTH.size:
+                    break  # End of the file
+                length, = LENGTH.unpack(prefix)
+                payload = file.read(length)
+                if len(payload) < max(length, HEADER.size):
+                    break  # Record still being written; read it next time
+                rows, actions = hand_rows(number, payload)
+                seat_rows += rows
+                action_rows += actions
+                number += 1
+                offset += LENGTH.size + length
+                if number % BATCH_SIZE == 0:
+                    self.commit(seat_rows, action_rows, offset, number)
+                    seat_rows, action_rows = [], []
+        self.commit(seat_rows, action_rows, offset, number)
+        return number - start
+
+    def commit(self, seat_rows: list, action_rows: list, offset: int, hands: int) -> None:
+        """Write a batch of rows, then the state that marks them as stored."""
+        self.append("seats", seat_rows)
+        self.append("actions", action_rows)
+        self.state = {"offset": offset, "hands": hands}
+        with open(self.state_path, "w") as file:
+            json.dump(self.state, file)
+        self.refresh()
+
+    def __len__(self) -> int:
+        """Return the number of hands in the store."""
+        return self.state["hands"]
+
+    def player_stats(self) -> PlayerStats:
+        """Return VPIP, PFR, aggression, showdown win rate and net chips per player."""
+        players, inverse = np.unique(self.column("seats", "player"), return_inverse=True)
+
+        def total(name: str, mask: np.ndarray | None = None) -> np.ndarray:
+            """Sum a column, or a mask of rows, per player."""
+            weights = self.column("seats", name) if mask is None else mask
+            return np.bincount(inverse, weights=weights, minlength=len(players))
+
+        hands = np.bincount(inverse, minlength=len(players))
+        showdowns = total("showdown")
+        calls = total("passive")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return PlayerStats(
+                player=players,
+                hands=hands,
+                vpip=total("vpip") / hands,
+                pfr=total("pfr") / hands,
+                aggression=total("aggressive") / calls,
+                showdown_win=total("showdown", self.showdown_wins()) / showdowns,
+                net=(total("payout") - total("invested")).astype(np.int64))
+
+    def showdown_wins(self) -> np.ndarray:
+        """Return the mask of seat rows that won chips at a showdown."""
+        return self.column("seats", "showdown") & (self.column("seats", "payout") > 0)
+
+    def category_win_rate(self) -> dict[str, tuple[int, float]]:
+        """Return the showdowns and showdown win rate of every SCORE_RANK category reached."""
+        category = self.column("seats", "category")
+        showdowns = np.bincount(category, minlength=len(SCORE_RANK) + 1)
+        wins = np.bincount(category, weights=self.showdown_wins(), minlength=len(SCORE_RANK) + 1)
+        return {SCORE_RANK[rank]: (int(showdowns[rank]), float(wins[rank] / showdowns[rank]))
+                for rank in SCORE_RANK if showdowns[rank]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a hand history and print player statistics.")
+    parser.add_argument("history", help="hand history file written by HandRecorder")
+    parser.add_argument("store", help="directory of the columnar store")
+    arguments = parser.parse_args()
+
+    store = HandStore(arguments.store)
+    print(f"{store.ingest(arguments.history)} new hands, {len(store)} in the store")
+    stats = store.player_stats()
+    print("Player  Hands   VPIP    PFR    AF  W$SD      Net")
+    for row in zip(*stats):
+        print("{:>6} {:>6} {:>6.1%} {:>6.1%} {:>5.2f} {:>5.1%} {:>8}".format(*row))
+    print()
+    for name, (showdowns, rate) in store.category_win_rate().items():
+        print(f"{name}: {rate:.1%} of {showdowns} showdowns won")
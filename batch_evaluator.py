@@ -0,0 +1,91 @@
+"""Vectorized NumPy evaluator for large batches of card index arrays."""
+import numpy as np
+
+from cards import card_index
+from evaluator import CATEGORY_SHIFT, FLUSH_TABLE, straight_high
+
+# Rows evaluated per chunk, which bounds the size of the temporary arrays
+CHUNK_SIZE = 1 << 16
+
+# Best straight high card and highest value for every 13-bit rank mask
+STRAIGHT_HIGH = np.array([straight_high(mask) for mask in range(1 << 13)], dtype=np.int64)
+TOP_VALUE = np.array([mask.bit_length() + 1 if mask else 0 for mask in range(1 << 13)],
+                     dtype=np.int64)
+FLUSH_STRENGTH = np.array(FLUSH_TABLE, dtype=np.int64)
+
+VALUE_BITS = 1 << np.arange(13, dtype=np.int64)  # Rank mask bit of each value
+
+
+def to_index_array(hands) -> np.ndarray:
+    """Convert equally sized (value, suit) hands into an (N, k) uint8 array."""
+    return np.array([[card_index(card) for card in hand] for hand in hands], dtype=np.uint8)
+
+
+def pack(category: int, kickers: list) -> np.ndarray:
+    """Pack a category and kicker value columns into strength ordinals."""
+    ordinal = np.int64(category) << CATEGORY_SHIFT
+    for index, kicker in enumerate(kickers):
+        ordinal = ordinal | (kicker << (16 - 4 * index))  # Kicker nibbles, highest first
+    return ordinal
+
+
+def evaluate_chunk(cards: np.ndarray) -> np.ndarray:
+    """Return the strength ordinals of one chunk of card index rows."""
+    rows = np.arange(len(cards))[:, None]
+    values = cards.astype(np.int64) >> 2  # Value offset 0-12
+    suits = cards.astype(np.int64) & 3  # Suit offset 0-3
+    value_slots = (values + 13 * rows).ravel()  # Histogram bucket per card
+    suit_slots = (suits + 4 * rows).ravel()  # Suit bucket per card
+
+    counts = np.bincount(value_slots, minlength=13 * len(cards)).reshape(-1, 13)
+    suit_counts = np.bincount(suit_slots, minlength=4 * len(cards)).reshape(-1, 4)
+    suit_masks = np.bincount(suit_slots, weights=VALUE_BITS[values].ravel(),
+                             minlength=4 * len(cards)).reshape(-1, 4).astype(np.int64)
+    rank_mask = np.bitwise_or.reduce(suit_masks, axis=1)  # Values present in any suit
+
+    # Order values by multiplicity first, then by value, like rank_strength
+    keys = np.sort(counts * 16 + np.arange(13), axis=1)[:, :-6:-1]
+    order = keys & 15  # Value offsets of the five leading groups
+    group_counts = keys >> 4
+    groups = np.where(group_counts > 0, order + 2, 0)  # Values, zero padded
+    best, second = group_counts[:, 0], group_counts[:, 1]
+
+    # Highest value left once the leading one or two groups are removed
+    rest_one = TOP_VALUE[rank_mask & ~VALUE_BITS[order[:, 0]]]
+    rest_two = TOP_VALUE[rank_mask & ~VALUE_BITS[order[:, 0]] & ~VALUE_BITS[order[:, 1]]]
+    high = STRAIGHT_HIGH[rank_mask]
+
+    ordinal = np.select(
+        [best == 4,
+         (best == 3) & (second >= 2),
+         high > 0,
+         best == 3,
+         (best == 2) & (second == 2),
+         best == 2],
+        [pack(8, [groups[:, 0], rest_one]),  # Four of a Kind
+         pack(7, [groups[:, 0], groups[:, 1]]),  # Full House
+         pack(5, [high]),  # Straight
+         pack(4, [groups[:, i] for i in range(3)]),  # Three of a Kind
+         pack(3, [groups[:, 0], groups[:, 1], rest_two]),  # Two Pair
+         pack(2, [groups[:, i] for i in range(4)])],  # Pair
+        pack(1, [groups[:, i] for i in range(5)]))  # High Card
+
+    # A flush outranks every non-flush hand that fits in seven cards
+    flush = suit_counts >= 5
+    flush_mask = np.take_along_axis(suit_masks, flush.argmax(axis=1)[:, None], axis=1)[:, 0]
+    return np.where(flush.any(axis=1), FLUSH_STRENGTH[flush_mask], ordinal)
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """Return the (N,) strength ordinals of an (N, k) array of card indexes.
+
+    Each row holds 1 to 7 distinct card indexes from card_index, and the
+    ordinals match evaluator.evaluate for the same cards.
+    """
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 1 <= cards.shape[1] <= 7:
+        raise ValueError(f"Expected an (N, 1-7) card array, got shape {cards.shape}")
+    result = np.empty(len(cards), dtype=np.int64)
+    for start in range(0, len(cards), CHUNK_SIZE):
+        result[start:start + CHUNK_SIZE] = evaluate_chunk(cards[start:start + CHUNK_SIZE])
+    return result
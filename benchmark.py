@@ -0,0 +1,239 @@
+"""Benchmarks of the hot paths on fixed seeded workloads, with baseline comparison."""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from cards import Deck, mask_to_cards
+from evaluator import evaluate_mask
+from gamestate import GameState
+from poker import (BET, RAISE, Decision, MainPot, PassiveStrategy, PlayerGroup, RandomStrategy,
+                   check_result, minimum_raise, no_sink, play_hand, showdown)
+
+
+def random_masks(rng: random.Random, count: int, size: int = 7) -> list[int]:
+    """Return card masks of random hands of the given size."""
+    return [sum(1 << index for index in rng.sample(range(52), size)) for _ in range(count)]
+
+
+def all_in_group(rng: random.Random) -> tuple[PlayerGroup, int]:
+    """Return 2 to 10 players all in for random amounts, dealt cards, with their board."""
+    players = PlayerGroup(rng.randint(2, 10), 0)
+    deck = Deck(rng=rng)
+    for index, player in enumerate(players):
+        player.bet = rng.randint(1, 200)
+        player.all_in = True
+        player.fold_status = index > 1 and rng.random() < 0.2  # Two players always reach showdown
+        player.hand_mask = deck.deal(2)
+    return players, deck.deal(5)
+
+
+def evaluator_workload(rng: random.Random, count: int) -> tuple:
+    """check_result on random 7-card hands."""
+    hands = [(mask_to_cards(mask), set()) for mask in random_masks(rng, count)]
+    return check_result, hands
+
+
+def mask_workload(rng: random.Random, count: int) -> tuple:
+    """evaluate_mask on random 7-card masks."""
+    return evaluate_mask, [(mask,) for mask in random_masks(rng, count)]
+
+
+def batch_workload(rng: random.Random, count: int) -> tuple:
+    """evaluate_batch on blocks of 10,000 random 7-card hands."""
+    blocks = []
+    for _ in range(max(1, count // 1000)):
+        cards = np.argsort(np.random.default_rng(rng.getrandbits(32)).random((10_000, 52)), axis=1)
+        blocks.append((cards[:, :7].astype(np.uint8),))
+    return evaluate_batch, blocks
+
+
+def deal_workload(rng: random.Random, count: int) -> tuple:
+    """Reset a seeded Deck and deal a 6-player hand with its board."""
+    deck = Deck(seed=rng.getrandbits(32))
+
+    def deal() -> int:
+        deck.reset()
+        return deck.deal(17)
+    return deal, [()] * count
+
+
+def pot_workload(rng: random.Random, count: int) -> tuple:
+    """MainPot.add_pot and add_side_pot over 2 to 10 all-in players."""
+    def settle(players: PlayerGroup) -> list:
+        main = MainPot()
+        main.add_pot(players)
+        return main.add_side_pot(players)
+    return settle, [(all_in_group(rng)[0],) for _ in range(count)]
+
+
+def showdown_workload(rng: random.Random, count: int) -> tuple:
+    """showdown of 2 to 10 all-in players, side pots included."""
+    cases = []
+    for _ in range(count):
+        players, board = all_in_group(rng)
+        main = MainPot()
+        main.add_pot(players)
+        cases.append((players, board, main, 0))
+    return showdown, cases
+
+
+def hand_workload(rng: random.Random, count: int) -> tuple:
+    """Complete headless 6-player hands between passive and random bots."""
+    players = PlayerGroup(6, 1_000_000)  # Deep enough that nobody busts
+    strategies = {player.id: RandomStrategy(random.Random(rng.getrandbits(32))) if seat % 2
+                  else PassiveStrategy() for seat, player in enumerate(players)}
+    deck = Deck(seed=rng.getrandbits(32))
+    return play_hand, [(players, button % 6, strategies, no_sink, deck) for button in range(count)]
+
+
+def state_workload(rng: random.Random, count: int) -> tuple:
+    """Replay random action lines of 6-player hands with GameState.apply from the deal."""
+    lines = []
+    for button in range(count):
+        cards = rng.sample(range(52), 17)
+        hands = tuple(1 << cards[2 * seat] | 1 << cards[2 * seat + 1] for seat in range(6))
+        state = root = GameState.deal((100,) * 6, button % 6, hands, tuple(cards[12:]))
+        decisions = []
+        while not state.terminal:
+            action = rng.choice(state.legal_actions())
+            amount = 1 if action == BET else minimum_raise(state.round_bet) if action == RAISE else 0
+            decisions.append(Decision(action, amount))
+            state = state.apply(decisions[-1])
+        lines.append((root, decisions))
+
+    def replay(root: GameState, decisions: list) -> GameState:
+        for decision in decisions:
+            root = root.apply(decision)
+        return root
+    return replay, lines
+
+
+def startup_workload(rng: random.Random, count: int) -> tuple:
+    """Start a fresh interpreter that imports poker, as a pool worker does."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def start() -> None:
+        subprocess.run([sys.executable, "-c", "import poker"], cwd=directory, check=True)
+    return start, [()] * count
+
+
+# Name, workload and operations per run of every benchmark
+BENCHMARKS = {
+    "check_result": (evaluator_workload, 20_000),
+    "evaluate_mask": (mask_workload, 50_000),
+    "evaluate_batch": (batch_workload, 5_000),
+    "deal": (deal_workload, 50_000),
+    "side_pots": (pot_workload, 10_000),
+    "showdown": (showdown_workload, 5_000),
+    "hand": (hand_workload, 2_000),
+    "game_state": (state_workload, 5_000),
+    "startup": (startup_workload, 20),
+}
+
+STARTUP_BUDGET_MS = 150  # Median time a new process may take to import poker
+
+
+def run_benchmark(name: str, seed: int, repeat: int, scale: float) -> dict:
+    """Time one benchmark and return its throughput and latency percentiles.
+
+    Every call is timed on its own for the percentiles. Throughput comes
+    from the fastest of the repeated runs, which is the least disturbed
+    by the rest of the machine. Workloads are rebuilt for each run, so
+    calls that change their arguments start from the same state.
+    """
+    workload, count = BENCHMARKS[name]
+    count = max(1, int(count * scale))
+    samples = []
+    best = None
+    for _ in range(repeat):
+        function, cases = workload(random.Random(seed), count)
+        timings = np.empty(len(cases), dtype=np.int64)
+        clock = time.perf_counter_ns
+        start = clock()
+        for index, arguments in enumerate(cases):
+            before = clock()
+            function(*arguments)
+            timings[index] = clock() - before
+        elapsed = clock() - start
+        best = elapsed if best is None else min(best, elapsed)
+        samples.append(timings)
+    timings = np.concatenate(samples) / 1000  # Microseconds per call
+    return {
+        "ops": len(cases),
+        "ops_per_sec": len(cases) / (best / 1e9),
+        "p50_us": float(np.percentile(timings, 50)),
+        "p90_us": float(np.percentile(timings, 90)),
+        "p99_us": float(np.percentile(timings, 99)),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a message for every benchmark slower than its baseline by more than the threshold."""
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        if name not in baseline.get("benchmarks", {}):
+            continue
+        reference = baseline["benchmarks"][name]["ops_per_sec"]
+        change = result["ops_per_sec"] / reference - 1
+        if change < -threshold:
+            regressions.append(f"{name}: {result['ops_per_sec']:,.0f} ops/s is "
+                               f"{-change:.1%} below the baseline of {reference:,.0f} ops/s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the poker engine's hot paths.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the workloads")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the workload sizes")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="largest throughput drop allowed against the baseline")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS,
+                        help="milliseconds the startup benchmark may take at the median")
+    arguments = parser.parse_args()
+    for name in arguments.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": arguments.seed,
+        "benchmarks": {},
+    }
+    print(f"{'benchmark':<16}{'ops/s':>14}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}")
+    for name in arguments.names or BENCHMARKS:
+        result = run_benchmark(name, arguments.seed, arguments.repeat, arguments.scale)
+        results["benchmarks"][name] = result
+        print(f"{name:<16}{result['ops_per_sec']:>14,.0f}{result['p50_us']:>10.1f}"
+              f"{result['p90_us']:>10.1f}{result['p99_us']:>10.1f}")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    failures = []
+    startup = results["benchmarks"].get("startup")
+    if startup and startup["p50_us"] > arguments.startup_budget * 1000:
+        failures.append(f"startup: {startup['p50_us'] / 1000:.0f} ms is over the "
+                        f"budget of {arguments.startup_budget:.0f} ms")
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            failures += compare(results, json.load(file), arguments.threshold)
+    for message in failures:
+        print(f"REGRESSION {message}")
+    if failures:
+        sys.exit(1)
+    if arguments.baseline:
+        print("No regressions against the baseline")
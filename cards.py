@@ -0,0 +1,116 @@
+"""Compact card encoding: 0-51 card indexes, 52-bit hand masks and the deck."""
+import random
+from array import array
+
+# Card values and suits, matching VAL_RANK and SUIT_RANK in poker.py
+VALUES = range(2, 15)
+SUITS = range(1, 5)
+
+# Short card text such as "Ah": value character by value, suit character by suit
+VALUE_TEXT = "..23456789TJQKA"
+SUIT_TEXT = ".cdhs"
+
+FULL_DECK = (1 << 52) - 1  # Mask holding every card
+FULL_ORDER = array("B", range(52))  # Card indexes of a new deck, in order
+
+
+def card_index(card: tuple) -> int:
+    """Return the 0-51 index of a (value, suit) card."""
+    return (card[0] - 2) * 4 + card[1] - 1
+
+
+def index_card(index: int) -> tuple:
+    """Return the (value, suit) card of a 0-51 index."""
+    return (index // 4 + 2, index % 4 + 1)
+
+
+# Conversions between the two forms, precomputed for every card
+CARD_INDEX = {(val, suit): card_index((val, suit)) for val in VALUES for suit in SUITS}
+INDEX_CARD = [index_card(index) for index in range(52)]
+CARD_MASK = {card: 1 << index for card, index in CARD_INDEX.items()}
+
+
+def cards_to_mask(cards) -> int:
+    """Return the mask of (value, suit) cards."""
+    mask = 0
+    for card in cards:
+        mask |= CARD_MASK[card]
+    return mask
+
+
+def mask_indexes(mask: int) -> list[int]:
+    """Return the card indexes set in a mask, lowest first."""
+    indexes = []
+    while mask:
+        low = mask & -mask  # Lowest set bit
+        indexes.append(low.bit_length() - 1)
+        mask ^= low
+    return indexes
+
+
+def mask_to_cards(mask: int) -> set:
+    """Return the (value, suit) cards of a mask."""
+    return {INDEX_CARD[index] for index in mask_indexes(mask)}
+
+
+def parse_card(text: str) -> tuple:
+    """Return the (value, suit) card of short card text such as "Ah" or "Td"."""
+    if len(text) != 2 or text[0].upper() not in VALUE_TEXT[2:] or text[1].lower() not in SUIT_TEXT[1:]:
+        raise ValueError(f"Cannot read the card {text!r}")
+    return (VALUE_TEXT.index(text[0].upper()), SUIT_TEXT.index(text[1].lower()))
+
+
+def card_count(mask: int) -> int:
+    """Return the number of cards in a mask."""
+    return mask.bit_count()
+
+
+class Deck:
+    """Deck of 52 card indexes dealt by a partial Fisher-Yates shuffle.
+
+    Each deal swaps a random undealt card into place and advances the deal
+    position, so dealing costs O(1) per card and the deck never rebuilds.
+    """
+
+    def __init__(self, seed: int | None = None, rng: random.Random | None = None) -> None:
+        """Initialize a full deck drawing from the given RNG or a new seeded one."""
+        self.rng = rng or random.Random(seed)  # Independent of the global random module
+        self.cards = array("B", range(52))  # Dealt cards first, then the undealt ones
+        self.position = 0  # Number of cards dealt so far
+
+    def reset(self, seed: int | None = None) -> None:
+        """Return every card to the deck, reseeding it if a seed is given."""
+        if seed is not None:
+            self.rng.seed(seed)
+            self.cards[:] = FULL_ORDER  # Same starting order, so the seed alone replays a hand
+        self.position = 0
+
+    def deal_index(self) -> int:
+        """Deal one card and return its index."""
+        position = self.position
+        if position == 52:
+            raise IndexError("Deal from an empty deck")
+        swap = position + int(self.rng.random() * (52 - position))  # Random undealt card
+        cards = self.cards
+        cards[position], cards[swap] = cards[swap], cards[position]
+        self.position = position + 1
+        return cards[position]
+
+    def deal(self, number_of_cards: int) -> int:
+        """Deal cards and return them as a card mask."""
+        mask = 0
+        for _ in range(number_of_cards):
+            mask |= 1 << self.deal_index()
+        return mask
+
+    def remove(self, mask: int) -> None:
+        """Take known cards out of the undealt part of the deck."""
+        cards = self.cards
+        for position in range(self.position, 52):
+            if mask >> cards[position] & 1:
+                cards[self.position], cards[position] = cards[position], cards[self.position]
+                self.position += 1  # Treat the card as already dealt
+
+    def __len__(self) -> int:
+        """Return the number of undealt cards."""
+        return 52 - self.position
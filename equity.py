@@ -0,0 +1,168 @@
+"""Win probability of hands by Monte Carlo simulation or exact enumeration."""
+import random
+from math import comb
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import NamedTuple
+
+from evaluator import CARD_KEY, evaluate_key
+from poker import new_deck
+
+# Trials per shard; fixed so a seed gives the same result for any worker count
+SHARD_SIZE = 20_000
+
+
+class EquityResult(NamedTuple):
+    """Outcome fractions of a simulation with their confidence intervals."""
+    win: float  # Fraction of runouts won outright
+    tie: float  # Fraction of runouts split with at least one opponent
+    lose: float  # Fraction of runouts lost
+    equity: float  # Expected share of the pot, counting split pots
+    trials: int  # Number of runouts simulated
+    win_interval: tuple[float, float]
+    tie_interval: tuple[float, float]
+    lose_interval: tuple[float, float]
+
+
+def wilson_interval(successes: int, trials: int, confidence: float) -> tuple[float, float]:
+    """Return the Wilson score interval of a binomial proportion."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)  # Two-sided critical value
+    share = successes / trials
+    centre = (share + z * z / (2 * trials)) / (1 + z * z / trials)
+    margin = (z / (1 + z * z / trials)
+              * ((share * (1 - share) + z * z / (4 * trials)) / trials) ** 0.5)
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+def simulate(hand: list, opponents: int, community_card: list, trials: int, seed: int) -> tuple:
+    """Play out one shard of runouts and return (wins, ties, losses, share)."""
+    rng = random.Random(seed)
+    known = set(hand) | set(community_card)
+    remaining = [CARD_KEY[card] for card in new_deck() - known]  # Undealt cards
+    board_key = sum(CARD_KEY[card] for card in community_card)
+    hand_key = sum(CARD_KEY[card] for card in hand)
+    missing = 5 - len(community_card)  # Community cards still to come
+    wins = ties = losses = 0
+    share = 0.0
+    for _ in range(trials):
+        dealt = rng.sample(remaining, missing + 2 * opponents)
+        board = board_key + sum(dealt[:missing])  # Complete the board
+        hero = evaluate_key(hand_key + board)
+        best = 0
+        tied = 0  # Opponents holding exactly the hero's strength
+        for seat in range(missing, len(dealt), 2):
+            villain = evaluate_key(board + dealt[seat] + dealt[seat + 1])
+            if villain > best:
+                best = villain
+            if villain == hero:
+                tied += 1
+        if hero > best:
+            wins += 1
+        elif hero == best:
+            ties += 1
+            share += 1 / (tied + 1)  # Split the pot with every tied opponent
+        else:
+            losses += 1
+    return wins, ties, losses, share
+
+
+def monte_carlo_equity(hand: set, opponents: int, community_card: set = frozenset(),
+                       trials: int = 100_000, workers: int | None = None,
+                       seed: int | None = None, confidence: float = 0.95) -> EquityResult:
+    """Estimate the win, tie and lose fractions of a hand by simulation.
+
+    Opponent hole cards and the rest of the board are dealt at random from
+    the cards left in a new_deck, and shards of SHARD_SIZE runouts run in a
+    process pool of the given number of workers (None uses every core).
+    """
+    if len(hand) != 2:
+        raise ValueError("A hand must hold exactly 2 cards")
+    if len(community_card) > 5:
+        raise ValueError("The board holds at most 5 community cards")
+    if set(hand) & set(community_card):
+        raise ValueError("Hand and community cards overlap")
+    if not 1 <= opponents <= (52 - 2 - 5) // 2:
+        raise ValueError("Number of opponents must be between 1 and 22")
+    if trials < 1:
+        raise ValueError("Number of trials must be positive")
+
+    master = random.Random(seed)
+    shards = [(list(hand), opponents, list(community_card),
+               min(SHARD_SIZE, trials - start), master.getrandbits(64))
+              for start in range(0, trials, SHARD_SIZE)]
+    if workers == 1 or len(shards) == 1:
+        results = [simulate(*shard) for shard in shards]  # Skip pool start-up cost
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate, *zip(*shards)))
+
+    wins, ties, losses, share = (sum(column) for column in zip(*results))
+    return EquityResult(
+        win=wins / trials,
+        tie=ties / trials,
+        lose=losses / trials,
+        equity=(wins + share) / trials,
+        trials=trials,
+        win_interval=wilson_interval(wins, trials, confidence),
+        tie_interval=wilson_interval(ties, trials, confidence),
+        lose_interval=wilson_interval(losses, trials, confidence))
+
+
+def score_board(states: list, tally: list) -> None:
+    """Add the result of one complete board to the tally of every hand."""
+    strengths = [evaluate_key(state) for state in states]
+    best = max(strengths)
+    winners = [seat for seat, value in enumerate(strengths) if value == best]
+    for seat in winners:
+        tally[seat][0 if len(winners) == 1 else 1] += 1  # Outright win or split
+        tally[seat][2] += 1 / len(winners)
+
+
+def walk_boards(states: list, remaining: list, start: int, missing: int, tally: list) -> None:
+    """Add every board completion to the tally, sharing work per board prefix.
+
+    Each state is a hand key plus the board prefix dealt so far, so dealing
+    the next card costs one addition per hand however many boards follow.
+    """
+    if missing == 0:
+        score_board(states, tally)
+        return
+    for index in range(start, len(remaining) - missing + 1):
+        card = remaining[index]
+        walk_boards([state + card for state in states], remaining, index + 1, missing - 1, tally)
+
+
+def exact_equity(hands: list[set], community_card: set = frozenset()) -> list[EquityResult]:
+    """Return the exact equity of each hand over every remaining board.
+
+    Hands and community cards use the (value, suit) model of Player.cards
+    and every undealt card of new_deck is a possible runout card.
+    """
+    if len(hands) < 2:
+        raise ValueError("At least two hands are needed")
+    if len(community_card) > 5:
+        raise ValueError("The board holds at most 5 community cards")
+    known = set(community_card)
+    for hand in hands:
+        if len(hand) != 2 or known & set(hand):
+            raise ValueError("Each hand must hold 2 cards unseen elsewhere")
+        known |= set(hand)
+
+    board_key = sum(CARD_KEY[card] for card in community_card)
+    states = [board_key + sum(CARD_KEY[card] for card in hand) for hand in hands]
+    remaining = [CARD_KEY[card] for card in new_deck() - known]  # Undealt cards
+    missing = 5 - len(community_card)
+    tally = [[0, 0, 0.0] for _ in hands]  # Wins, ties and pot share per hand
+    walk_boards(states, remaining, 0, missing, tally)
+
+    boards = comb(len(remaining), missing)  # Every runout is equally likely
+    return [EquityResult(
+        win=wins / boards,
+        tie=ties / boards,
+        lose=(boards - wins - ties) / boards,
+        equity=share / boards,
+        trials=boards,
+        win_interval=(wins / boards, wins / boards),  # Exact, so no spread
+        tie_interval=(ties / boards, ties / boards),
+        lose_interval=((boards - wins - ties) / boards, (boards - wins - ties) / boards))
+        for wins, ties, share in tally]
@@ -0,0 +1,213 @@
+"""Lookup-table hand evaluator for 1 to 7 card Texas Hold'em hands."""
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import combinations_with_replacement
+
+from cards import INDEX_CARD, SUITS, VALUES
+
+# A hand key is the sum of its card keys and packs three fields:
+# bits 0-63 hold one 16-bit rank mask per suit, bits 64-75 hold a 3-bit card
+# count per suit and bits 76+ hold a base-5 rank histogram (one digit per value)
+COUNT_SHIFT = 64
+HISTOGRAM_SHIFT = 76
+
+# Strength ordinals are the SCORE_RANK category followed by five 4-bit kickers
+CATEGORY_SHIFT = 20
+
+# Rank mask of the Ace-to-Five straight
+WHEEL = 0x100F
+
+# Precomputed tables, rebuilt by running this module; a stale or missing
+# file makes the import build the tables instead, which takes much longer
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluator_tables.bin")
+TABLES_HEADER = struct.Struct("<4sHIII")  # Magic, version and the size of each table
+TABLES_MAGIC = b"PKEV"
+TABLES_VERSION = 1  # Bump whenever the strength ordinals change
+
+
+def card_key(card: tuple) -> int:
+    """Return the evaluator key of a (value, suit) card."""
+    value, suit = card
+    return ((1 << (16 * (suit - 1) + value - 2))  # Bit in the suit's rank mask
+            | (1 << (COUNT_SHIFT + 3 * (suit - 1)))  # One more card of this suit
+            | (5 ** (value - 2) << HISTOGRAM_SHIFT))  # One more card of this value
+
+
+# Key of every card in the deck, keyed by (value, suit) and by card index
+CARD_KEY = {(val, suit): card_key((val, suit)) for suit in SUITS for val in VALUES}
+CARD_KEYS = [CARD_KEY[card] for card in INDEX_CARD]
+
+
+def strength(category: int, kickers: list[int]) -> int:
+    """Pack a hand category and its kicker values into a strength ordinal."""
+    ordinal = category
+    for index in range(5):
+        ordinal <<= 4
+        if index < len(kickers):
+            ordinal |= kickers[index]  # Pad missing kickers with zeros
+    return ordinal
+
+
+def hand_category(ordinal: int) -> int:
+    """Return the SCORE_RANK category of a strength ordinal."""
+    return ordinal >> CATEGORY_SHIFT
+
+
+def straight_high(mask: int) -> int:
+    """Return the high card of the best straight in a 13-bit rank mask, or 0."""
+    for high in range(14, 5, -1):
+        window = 0x1F << (high - 6)  # Five consecutive values ending at high
+        if mask & window == window:
+            return high
+    if mask & WHEEL == WHEEL:
+        return 5  # Ace plays low in the wheel
+    return 0
+
+
+def flush_strength(mask: int) -> int:
+    """Return the strength of the best hand made from a suit's rank mask."""
+    values = [val for val in VALUES if mask >> (val - 2) & 1]
+    high = straight_high(mask)
+    if high == 14:
+        return strength(10, [14])  # Royal Flush
+    if high:
+        return strength(9, [high])  # Straight Flush
+    return strength(6, sorted(values, reverse=True)[:5])  # Flush
+
+
+def rank_strength(counts: dict) -> int:
+    """Return the strength of the best non-flush hand for a value histogram."""
+    # Order values by multiplicity first, then by value
+    groups = sorted(counts, key=lambda val: (counts[val], val), reverse=True)
+    best = counts[groups[0]]
+    second = counts[groups[1]] if len(groups) > 1 else 0
+    high = straight_high(sum(1 << (val - 2) for val in counts))
+    if best == 4:
+        return strength(8, [groups[0], max(groups[1:], default=0)])  # Four of a Kind
+    if best == 3 and second >= 2:
+        return strength(7, groups[:2])  # Full House
+    if high:
+        return strength(5, [high])  # Straight
+    if best == 3:
+        return strength(4, groups[:3])  # Three of a Kind
+    if best == 2 and second == 2:
+        return strength(3, groups[:2] + [max(groups[2:], default=0)])  # Two Pair
+    if best == 2:
+        return strength(2, groups[:4])  # Pair
+    return strength(1, groups[:5])  # High Card
+
+
+def build_flush_suit() -> list[int]:
+    """Map every packed suit count field to the flush suit offset, or -1."""
+    table = []
+    for field in range(1 << 12):
+        suit = -1
+        for offset in range(4):
+            if field >> (3 * offset) & 7 >= 5:
+                suit = offset  # At most one suit can hold five of seven cards
+        table.append(suit)
+    return table
+
+
+def build_flush_table() -> list[int]:
+    """Map every 13-bit rank mask with five or more cards to its strength."""
+    return [flush_strength(mask) if mask.bit_count() >= 5 else 0
+            for mask in range(1 << 13)]
+
+
+def build_rank_table() -> dict[int, int]:
+    """Map every reachable base-5 value histogram to its non-flush strength."""
+    table = {}
+    for size in range(1, 8):
+        for values in combinations_with_replacement(VALUES, size):
+            counts = {val: values.count(val) for val in set(values)}
+            if max(counts.values()) > 4:
+                continue  # A deck only holds four cards of each value
+            histogram = sum(count * 5 ** (val - 2) for val, count in counts.items())
+            table[histogram] = rank_strength(counts)
+    return table
+
+
+def little_endian(values: array) -> array:
+    """Return an array in little-endian byte order, the order of the tables file."""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def save_tables(flush_suit: list, flush_table: list, rank_table: dict, path: str = TABLES_PATH) -> None:
+    """Write the lookup tables to a compressed file."""
+    histograms = sorted(rank_table)  # Sorted keys compress better
+    payload = (little_endian(array("b", flush_suit)).tobytes()
+               + little_endian(array("I", flush_table)).tobytes()
+               + little_endian(array("I", histograms)).tobytes()
+               + little_endian(array("I", [rank_table[key] for key in histograms])).tobytes())
+    with open(path, "wb") as file:
+        file.write(TABLES_HEADER.pack(TABLES_MAGIC, TABLES_VERSION, len(flush_suit),
+                                      len(flush_table), len(rank_table)))
+        file.write(zlib.compress(payload, 9))
+
+
+def load_tables(path: str = TABLES_PATH) -> tuple | None:
+    """Return the lookup tables stored in a file, or None if it is missing or stale."""
+    try:
+        with open(path, "rb") as file:
+            magic, version, suits, flushes, ranks = TABLES_HEADER.unpack(file.read(TABLES_HEADER.size))
+            payload = zlib.decompress(file.read())
+    except (OSError, struct.error, zlib.error):
+        return None
+    if magic != TABLES_MAGIC or version != TABLES_VERSION or len(payload) != suits + 4 * flushes + 8 * ranks:
+        return None
+    flush_suit = little_endian(array("b", payload[:suits])).tolist()
+    flush_table = little_endian(array("I", payload[suits:suits + 4 * flushes])).tolist()
+    entries = little_endian(array("I", payload[suits + 4 * flushes:]))
+    return flush_suit, flush_table, dict(zip(entries[:ranks], entries[ranks:]))
+
+
+def build_tables() -> tuple:
+    """Build the lookup tables from scratch."""
+    return build_flush_suit(), build_flush_table(), build_rank_table()
+
+
+FLUSH_SUIT, FLUSH_TABLE, RANK_TABLE = load_tables() or build_tables()
+
+
+def evaluate_key(key: int) -> int:
+    """Return the strength ordinal of a packed hand key."""
+    suit = FLUSH_SUIT[(key >> COUNT_SHIFT) & 0xFFF]
+    if suit >= 0:
+        # A flush outranks every non-flush hand that fits in seven cards
+        return FLUSH_TABLE[(key >> (16 * suit)) & 0x1FFF]
+    return RANK_TABLE[key >> HISTOGRAM_SHIFT]
+
+
+def evaluate(cards) -> int:
+    """Return the strength ordinal of 1 to 7 (value, suit) cards.
+
+    Higher ordinals are better hands, equal ordinals split the pot, and
+    hand_category recovers the SCORE_RANK category.
+    """
+    return evaluate_key(sum(map(CARD_KEY.__getitem__, cards)))
+
+
+def mask_key(mask: int) -> int:
+    """Return the packed key of the cards in a card mask."""
+    key = 0
+    while mask:
+        low = mask & -mask  # Lowest set bit
+        key += CARD_KEYS[low.bit_length() - 1]
+        mask ^= low
+    return key
+
+
+def evaluate_mask(mask: int) -> int:
+    """Return the strength ordinal of a card mask holding 1 to 7 cards."""
+    return evaluate_key(mask_key(mask))
+
+
+if __name__ == "__main__":
+    save_tables(*build_tables())
+    print(f"Evaluator tables written to {TABLES_PATH}")
@@ -0,0 +1,302 @@
+"""Immutable state of one hand for search, following the engine's betting rules.
+
+A GameState never changes once built: apply returns a new state and the
+old one stays valid, so keeping a reference is a snapshot and going back
+to it is a restore. Per-seat fields are short tuples and folded and all-in
+players are bit masks, so applying an action copies a few small tuples
+rather than whole Player, MainPot and Deck objects.
+
+The rules are those of poker.hand and poker.act, quirks included: the
+blinds, the order of turns, the round bet every street after the preflop
+starts from, which streets are dealt, and how side pots and odd chips are
+settled. The board is fixed in advance and revealed street by street.
+"""
+from poker import (ALL_IN, BET, CALL, CHECK, FOLD, RAISE, ActionRequest, Decision, minimum_raise,
+                   pot_layers, split_chips, strength_tiers)
+from evaluator import evaluate_key, mask_key
+
+BOARD_SIZES = (0, 3, 4, 5)  # Community cards shown on each street
+
+
+class GameState:
+    """One moment of a hand: stacks, bets, pots, cards and whose turn it is."""
+
+    __slots__ = ("button", "small_blind", "opening_bet", "hands", "board", "balances", "bets",
+                 "contributions", "folded", "all_in", "street", "round_bet", "start", "repeat",
+                 "taken", "actor", "payouts")
+
+    @classmethod
+    def deal(cls, balances: tuple, button: int, hands: tuple, board: tuple) -> "GameState":
+        """Return the state of a new hand once the blinds are posted.
+
+        balances are the seats' chips in PlayerGroup order, hands the hole
+        card mask of each seat and board the five community card indexes in
+        the order they are dealt.
+        """
+        seats = len(balances)
+        if not 2 <= seats <= 10 or len(hands) != seats or len(board) != 5:
+            raise ValueError("A hand needs 2 to 10 seats, their hole cards and five board cards")
+        state = cls.__new__(cls)
+        balances, bets = list(balances), [0] * seats
+        small_blind = (button + 1) % seats
+        balances[small_blind] -= 1  # The small blind posts 1
+        bets[small_blind] = 1
+        if seats > 2:
+            big_blind = (small_blind + 1) % seats
+            balances[big_blind] -= 2  # The big blind posts 2
+            bets[big_blind] = 2
+            start, round_bet = (big_blind + 1) % seats, 2
+        else:
+            start, round_bet = (small_blind + 1) % seats, 1  # Heads up only the small blind posts
+        state.button = button
+        state.small_blind = small_blind
+        state.opening_bet = round_bet  # Round bet every later street starts from
+        state.hands = tuple(hands)
+        state.board = tuple(board)
+        state.balances = tuple(balances)
+        state.bets = tuple(bets)
+        state.contributions = (0,) * seats
+        state.folded = 0
+        state.all_in = 0
+        state.street = 0
+        state.round_bet = round_bet
+        state.start = start  # Seat the current pass of turns starts from
+        state.repeat = 0  # 1 once the round bet has changed, as in poker.turns
+        state.taken = 0  # Turns taken in the current pass
+        state.payouts = None
+        state.advance()
+        return state
+
+    @classmethod
+    def from_request(cls, request: ActionRequest, hands: tuple, board: tuple) -> "GameState":
+        """Return the state of the engine's hand at a decision, with the given cards.
+
+        Stacks, bets and statuses are read from the player's PlayerGroup and
+        the button it records. Whose turns remain is worked out from the
+        bets: after a raise, the raiser is the farthest player back whose bet
+        matches the round bet with only matching or inactive players between.
+        A check after a postflop bet of 1 or 2, which the rules allow, cannot be
+        told from a turn still to come and is taken for the latter.
+        """
+        group = request.player.group
+        players = list(group)
+        seats = len(players)
+        actor = players.index(request.player)
+        state = cls.__new__(cls)
+        state.button = group.button
+        state.small_blind = (group.button + 1) % seats
+        state.opening_bet = 2 if seats > 2 else 1
+        state.hands = tuple(hands)
+        state.board = tuple(board)
+        state.balances = tuple(player.balance for player in players)
+        state.bets = tuple(player.bet for player in players)
+        state.contributions = tuple(player.contribution for player in players)
+        state.folded = sum(1 << seat for seat, player in enumerate(players) if player.fold_status)
+        state.all_in = sum(1 << seat for seat, player in enumerate(players) if player.all_in)
+        state.street = BOARD_SIZES.index(len(request.community_card))
+        state.round_bet = request.round_bet
+        if state.street:
+            state.start = state.small_blind
+        else:
+            state.start = (state.small_blind + (2 if seats > 2 else 1)) % seats
+        state.repeat = 0
+        if request.round_bet != state.opening_bet:  # Someone has bet or raised this round
+            seat = actor
+            for _ in range(seats - 1):
+                seat = (seat - 1) % seats
+                if state.bets[seat] != request.round_bet:
+                    if (state.folded | state.all_in) >> seat & 1:
+                        continue  # Skipped by the turns, so no sign of where they began
+                    break
+                state.start, state.repeat = (seat + 1) % seats, 1
+        state.taken = (actor - state.start) % seats
+        state.actor = actor
+        state.payouts = None
+        return state
+
+    def with_cards(self, hands: tuple, board: tuple) -> "GameState":
+        """Return a copy of the state dealing other hole cards and board cards."""
+        state = self.copy()
+        state.hands = tuple(hands)
+        state.board = tuple(board)
+        return state
+
+    def copy(self) -> "GameState":
+        """Return a shallow copy that apply may change before handing it out."""
+        state = GameState.__new__(GameState)
+        state.button = self.button
+        state.small_blind = self.small_blind
+        state.opening_bet = self.opening_bet
+        state.hands = self.hands
+        state.board = self.board
+        state.balances = self.balances
+        state.bets = self.bets
+        state.contributions = self.contributions
+        state.folded = self.folded
+        state.all_in = self.all_in
+        state.street = self.street
+        state.round_bet = self.round_bet
+        state.start = self.start
+        state.repeat = self.repeat
+        state.taken = self.taken
+        state.actor = self.actor
+        state.payouts = self.payouts
+        return state
+
+    @property
+    def terminal(self) -> bool:
+        """Whether the hand is over and its payouts settled."""
+        return self.payouts is not None
+
+    @property
+    def board_mask(self) -> int:
+        """Card mask of the community cards shown so far."""
+        mask = 0
+        for index in self.board[:BOARD_SIZES[self.street]]:
+            mask |= 1 << index
+        return mask
+
+    @property
+    def public_key(self) -> tuple:
+        """Return everything every player can see of the state, without the cards."""
+        return (self.street, self.actor, self.round_bet, self.folded, self.all_in,
+                self.balances, self.bets, self.contributions)
+
+    @property
+    def pot(self) -> int:
+        """Chips in the pots and in front of the players."""
+        return sum(self.contributions) + sum(self.bets)
+
+    def legal_actions(self) -> tuple[str, ...]:
+        """Return the actions the player to act may choose, as poker.legal_actions does."""
+        actor = self.actor
+        if self.round_bet in (1, 2) and self.street:  # Nobody has bet yet after the preflop
+            options = [CHECK]
+            if self.balances[actor] > 0:
+                options += [BET, ALL_IN]
+        else:
+            options = [CALL]
+            if minimum_raise(self.round_bet) - self.bets[actor] <= self.balances[actor]:
+                options += [RAISE, ALL_IN]
+        return tuple(options + [FOLD])
+
+    def apply(self, decision: Decision) -> "GameState":
+        """Return the state after the player to act takes a decision.
+
+        Raises ValueError for a decision poker.check_decision would refuse.
+        """
+        if self.payouts is not None:
+            raise ValueError("The hand is over")
+        action, amount = decision
+        actor = self.actor
+        balance, bet = self.balances[actor], self.bets[actor]
+        round_bet = self.round_bet
+        if round_bet in (1, 2) and self.street:  # The checks of legal_actions, without the tuple
+            allowed = action in (CHECK, FOLD) or action in (BET, ALL_IN) and balance > 0
+        else:
+            allowed = action in (CALL, FOLD) or action in (RAISE, ALL_IN) and (
+                minimum_raise(round_bet) - bet <= balance)
+        if not allowed:
+            raise ValueError(f"{action} is not allowed now")
+        if action == BET and amount < 1 or action == RAISE and amount < minimum_raise(round_bet):
+            raise ValueError("Bet is too low")
+        if action in (BET, RAISE) and amount - bet > balance:
+            raise ValueError("Your balance is not enough!")
+
+        state = self.copy()
+        flag = 1 << actor
+        if action == FOLD:
+            state.folded |= flag
+        elif action == CALL:
+            owed = round_bet - bet
+            if balance >= owed:
+                balance -= owed
+                bet = round_bet
+                if balance == 0:
+                    state.all_in |= flag
+            else:
+                state.folded |= flag  # Players who cannot cover the call fold
+        elif action in (BET, RAISE):
+            balance -= amount - bet
+            bet = amount
+            if balance == 0:
+                state.all_in |= flag
+            round_bet = bet
+        elif action == ALL_IN:
+            bet += balance
+            balance = 0
+            state.all_in |= flag
+            round_bet = bet
+        if balance != self.balances[actor] or bet != self.bets[actor]:
+            balances, bets = list(self.balances), list(self.bets)
+            balances[actor], bets[actor] = balance, bet
+            state.balances, state.bets = tuple(balances), tuple(bets)
+
+        seats = len(self.balances)
+        if round_bet != self.round_bet:
+            # A new round bet gives everyone else another turn
+            state.round_bet = round_bet
+            state.start = (actor + 1) % seats
+            state.repeat = 1
+            state.taken = 0
+        else:
+            state.taken += 1
+            if seats - state.folded.bit_count() == 1:
+                state.collect()
+                state.settle()  # Everyone else folded
+                return state
+        state.advance()
+        return state
+
+    def advance(self) -> None:
+        """Move to the next player to act, dealing streets or settling when rounds end."""
+        seats = len(self.balances)
+        while True:
+            inactive = self.folded | self.all_in
+            while self.taken < seats - self.repeat:
+                seat = (self.start + self.taken) % seats
+                if not inactive >> seat & 1:
+                    self.actor = seat
+                    return
+                self.taken += 1
+            self.collect()  # The betting round is over
+            live = seats - self.folded.bit_count()
+            if self.street == 3 or live <= 1 or seats - self.all_in.bit_count() <= 1:
+                self.settle()  # No more streets are dealt
+                return
+            self.street += 1
+            self.round_bet = self.opening_bet
+            self.start = self.small_blind
+            self.repeat = 0
+            self.taken = 0
+
+    def collect(self) -> None:
+        """Move the bets of the round into the contributions, as MainPot.add_pot does."""
+        if any(self.bets):
+            self.contributions = tuple(map(int.__add__, self.contributions, self.bets))
+            self.bets = (0,) * len(self.bets)
+
+    def settle(self) -> None:
+        """Award the pots at showdown with the engine's pot_layers, strength_tiers and split_chips."""
+        seats = len(self.balances)
+        self.actor = -1
+        board_key = mask_key(self.board_mask)
+        scores = [0 if self.folded >> seat & 1 else evaluate_key(mask_key(self.hands[seat]) + board_key)
+                  for seat in range(seats)]
+        order = [(self.button + 1 + offset) % seats for offset in range(seats)]  # Left of the button first
+        live = [seat for seat in order if not self.folded >> seat & 1]
+        tiers = [[live[index] for index in members]  # Seats of equal strength, best first, in seat order
+                 for members in strength_tiers([scores[seat] for seat in live])]
+        tier = {seat: number for number, members in enumerate(tiers) for seat in members}
+
+        payouts = [0] * seats
+        folded = [bool(self.folded >> seat & 1) for seat in range(seats)]
+        for eligible, amount in pot_layers(list(self.contributions), folded):
+            ranks = [tier[seat] for seat in eligible if seat in tier]
+            if not ranks:
+                continue
+            winners = [seat for seat in tiers[min(ranks)] if seat in eligible]
+            for seat, share in zip(winners, split_chips(amount, len(winners))):
+                payouts[seat] += share
+        self.payouts = tuple(payouts)
+        self.balances = tuple(map(int.__add__, self.balances, payouts))
@@ -0,0 +1,232 @@
+"""Compact binary hand histories: a streaming recorder, reader and replayer."""
+import argparse
+import struct
+from array import array
+from typing import NamedTuple
+
+from cards import Deck, cards_to_mask, mask_indexes
+from poker import (ALL_IN, BET, CALL, CHECK, FOLD, RAISE, Decision, PlayerGroup,
+                   no_sink, play_hand)
+
+# Actions in the order of their one-byte codes
+ACTIONS = (CHECK, BET, CALL, RAISE, FOLD, ALL_IN)
+ACTION_CODE = {action: code for code, action in enumerate(ACTIONS)}
+
+# Record layout, little endian:
+#   length  I  size of the record that follows
+#   header  seats, button, board cards, 5 board card indexes in deal order, actions
+#   seats   player ID, hole card mask, starting balance, chips won
+#   actions seat, street << 4 | action code, total bet after the action
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<BBB5sH")
+SEAT = struct.Struct("<IQII")
+ACTION = struct.Struct("<BBI")
+
+BUFFER_SIZE = 1 << 20  # Bytes buffered before the recorder touches the disk
+
+
+class SeatRecord(NamedTuple):
+    """One player of a recorded hand."""
+    player_id: int  # Player ID during the recorded game
+    hand_mask: int  # Hole cards as a card mask
+    balance: int  # Balance before the blinds
+    payout: int  # Chips won from the pots
+
+
+class ActionRecord(NamedTuple):
+    """One decision of a recorded hand."""
+    seat: int  # Index of the acting player in the group
+    action: str  # One of the action constants
+    amount: int  # Player's total bet after the action
+    street: int = 0  # Betting round, 0 for the preflop to 3 for the river
+
+
+class HandRecord(NamedTuple):
+    """Everything needed to replay a hand and check its result."""
+    button: int  # Seat of the button
+    seats: tuple[SeatRecord, ...]
+    board: tuple[int, ...]  # Community card indexes in deal order
+    actions: tuple[ActionRecord, ...]
+
+
+def encode(record: HandRecord) -> bytes:
+    """Return the length-prefixed bytes of a hand record."""
+    board = bytes(record.board).ljust(5, b"\xff")  # Unused slots are padding
+    parts = [HEADER.pack(len(record.seats), record.button, len(record.board),
+                         board, len(record.actions))]
+    parts += [SEAT.pack(*seat) for seat in record.seats]
+    parts += [ACTION.pack(seat, street << 4 | ACTION_CODE[action], amount)
+              for seat, action, amount, street in record.actions]
+    payload = b"".join(parts)
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode(payload: bytes) -> HandRecord:
+    """Return the hand record stored in one record payload."""
+    seats, button, board_size, board, number_of_actions = HEADER.unpack_from(payload)
+    offset = HEADER.size
+    seat_records = []
+    for _ in range(seats):
+        seat_records.append(SeatRecord(*SEAT.unpack_from(payload, offset)))
+        offset += SEAT.size
+    actions = []
+    for _ in range(number_of_actions):
+        seat, code, amount = ACTION.unpack_from(payload, offset)
+        actions.append(ActionRecord(seat, ACTIONS[code & 15], amount, code >> 4))
+        offset += ACTION.size
+    return HandRecord(button, tuple(seat_records), tuple(board[:board_size]), tuple(actions))
+
+
+class HandRecorder:
+    """Event sink appending every finished hand to a binary history file.
+
+    Use it as the sink of play_hand, or pass its record method events from
+    another sink. Events are gathered in memory for the current hand only
+    and each finished hand is written through a large file buffer, so the
+    game loop never waits on the disk.
+    """
+
+    def __init__(self, path: str, sink=no_sink) -> None:
+        """Open the history file for appending, passing every event on to sink."""
+        self.file = open(path, "ab", buffering=BUFFER_SIZE)
+        self.sink = sink  # Sink shown the events after they are recorded
+        self.hands = 0  # Hands written so far
+        self.start_hand()
+
+    def start_hand(self) -> None:
+        """Clear the state of the hand being recorded."""
+        self.button = None  # Button player until the seats are known
+        self.seat = {}  # Seat of each player ID
+        self.seats = []  # [player ID, hole card mask, starting balance, chips won]
+        self.board = []  # Community card indexes in deal order
+        self.board_mask = 0
+        self.street = 0  # Betting round of the next actions
+        self.actions = []
+
+    def __call__(self, event: str, **fields) -> None:
+        """Record an event and pass it on to the wrapped sink."""
+        self.record(event, **fields)
+        self.sink(event, **fields)
+
+    def record(self, event: str, **fields) -> None:
+        """Add one game event to the hand being recorded."""
+        if event == "position":
+            self.start_hand()
+            self.button = fields["button"]
+        elif event == "street":
+            self.street = fields["round_count"]
+        elif event == "deal":
+            for seat, player in enumerate(fields["players"]):
+                self.seat[player.id] = seat
+                # Blinds are already posted, so add them back to the balance
+                self.seats.append([player.id, player.hand_mask, player.balance + player.bet, 0])
+        elif event == "board":
+            board_mask = cards_to_mask(fields["community_card"])
+            self.board += mask_indexes(board_mask & ~self.board_mask)  # New cards only
+            self.board_mask = board_mask
+        elif event == "action":
+            self.actions.append(ActionRecord(
+                self.seat[fields["player"].id], fields["action"], fields["amount"], self.street))
+        elif event == "pot_win":
+            self.seats[self.seat[fields["player"].id]][3] += fields["amount"]
+        elif event == "leaderboard":
+            self.write(HandRecord(self.seat[self.button.id], tuple(map(tuple, self.seats)),
+                                  tuple(self.board), tuple(self.actions)))
+
+    def write(self, record: HandRecord) -> None:
+        """Append one hand record to the file."""
+        self.file.write(encode(record))
+        self.hands += 1
+
+    def close(self) -> None:
+        """Flush the buffer and close the history file."""
+        self.file.close()
+
+    def __enter__(self) -> "HandRecorder":
+        """Return the recorder for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the recorder at the end of a with statement."""
+        self.close()
+
+
+def read_hands(path: str):
+    """Generator yielding the hand records of a history file one at a time."""
+    with open(path, "rb", buffering=BUFFER_SIZE) as file:
+        while True:
+            prefix = file.read(LENGTH.size)
+            if not prefix:
+                return  # End of the file
+            if len(prefix) < LENGTH.size:
+                raise ValueError("Truncated hand record")
+            length, = LENGTH.unpack(prefix)
+            payload = file.read(length)
+            if len(payload) < length:
+                raise ValueError("Truncated hand record")
+            yield decode(payload)
+
+
+class StackedDeck(Deck):
+    """Deck dealing a fixed order of cards, used to replay recorded deals."""
+
+    def __init__(self, order: list[int]) -> None:
+        """Initialize the deck to deal the given card indexes first."""
+        super().__init__()
+        rest = [index for index in range(52) if index not in order]
+        self.cards = array("B", list(order) + rest)
+
+    def deal_index(self) -> int:
+        """Deal the next card of the fixed order and return its index."""
+        if self.position == 52:
+            raise IndexError("Deal from an empty deck")
+        self.position += 1
+        return self.cards[self.position - 1]
+
+
+class ScriptedStrategy:
+    """Strategy repeating the decisions of a recorded hand."""
+
+    def __init__(self, actions: tuple[ActionRecord, ...], players: PlayerGroup) -> None:
+        """Initialize the script for the replayed group of players."""
+        self.actions = iter(actions)
+        self.seat = {player.id: seat for seat, player in enumerate(players)}
+
+    def decide(self, request) -> Decision:
+        """Return the next recorded decision, checking it belongs to the player asked."""
+        seat, action, amount, _ = next(self.actions, (None, None, None, None))
+        if seat != self.seat[request.player.id]:
+            raise ValueError("Replay asked a different player than the recording")
+        return Decision(action, amount)
+
+
+def replay(record: HandRecord, sink=no_sink) -> dict[int, int]:
+    """Play a recorded hand through the engine and return its chips won per recorded player ID."""
+    players = PlayerGroup(len(record.seats), 0)
+    for player, seat in zip(players, record.seats):
+        player.balance = seat.balance
+    order = [index for seat in record.seats for index in mask_indexes(seat.hand_mask)]
+    script = ScriptedStrategy(record.actions, players)
+    payouts = play_hand(players, record.button, {player.id: script for player in players},
+                        sink, StackedDeck(order + list(record.board)))
+    return {seat.player_id: payouts.get(player.id, 0)
+            for player, seat in zip(players, record.seats)}
+
+
+def verify(record: HandRecord) -> bool:
+    """Return whether replaying a hand gives the recorded payouts."""
+    return replay(record) == {seat.player_id: seat.payout for seat in record.seats}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a hand history file and check every result.")
+    parser.add_argument("path", help="hand history file written by HandRecorder")
+    arguments = parser.parse_args()
+
+    hands = mismatches = 0
+    for hand_record in read_hands(arguments.path):
+        hands += 1
+        if not verify(hand_record):
+            mismatches += 1
+            print(f"Hand {hands} does not replay to its recorded payouts")
+    print(f"{hands} hands replayed, {mismatches} mismatches")
@@ -0,0 +1,142 @@
+"""Independent Chip Model equity of tournament stacks, exact or sampled."""
+import argparse
+import functools
+
+import numpy as np
+
+MAX_EXACT = 16  # Largest field solved exactly; bigger fields are sampled
+SAMPLE_TRIALS = 100_000  # Finishing orders drawn by the sampled model
+
+
+@functools.lru_cache(maxsize=None)
+def subset_tables(players: int) -> tuple:
+    """Return the subset bits, subset sizes and subsets of each size for a field.
+
+    Subsets are bit masks of the players who already finished on top.
+    """
+    masks = np.arange(1 << players)
+    bits = ((masks[:, None] >> np.arange(players)) & 1).astype(bool)  # (2^n, n)
+    sizes = bits.sum(axis=1)
+    layers = [masks[sizes == size] for size in range(players + 1)]
+    return bits, sizes, layers
+
+
+def exact_equity(stacks: tuple, payouts: tuple) -> np.ndarray:
+    """Return the ICM equity of every stack by dynamic programming over subsets.
+
+    Each player takes the next place with probability proportional to
+    their stack among the players left. top[S] is the probability that the
+    players in subset S take the first |S| places in some order, built
+    from the subsets one player smaller. That costs 2^n states rather than
+    one per finishing order.
+    """
+    players = len(stacks)
+    places = min(len(payouts), players)
+    bits, sizes, layers = subset_tables(players)
+    chips = np.array(stacks, dtype=float)
+    left = chips.sum() - bits @ chips  # Chips of the players still to place, by subset
+    flags = 1 << np.arange(players)
+
+    top = np.zeros(1 << players)
+    top[0] = 1.0
+    for size in range(1, places):
+        layer = layers[size]
+        previous = layer[:, None] ^ flags  # The subset without each member
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = top[previous] * chips / left[previous]  # Non-members are masked out below
+        top[layer] = np.where(bits[layer], share, 0.0).sum(axis=1)
+
+    # Chance to take the place after each subset, times that place's payout
+    value = np.zeros(1 << players)
+    placed = sizes < places
+    value[placed] = top[placed] * np.asarray(payouts, dtype=float)[sizes[placed]] / left[placed]
+    return chips * (value @ ~bits)
+
+
+def sampled_equity(stacks: tuple, payouts: tuple, trials: int = SAMPLE_TRIALS, seed: int | None = 0) -> np.ndarray:
+    """Estimate the ICM equity of every stack from random finishing orders.
+
+    Sorting keys u ** (1 / stack) for uniform u draws the finishing order
+    with each place going to a player in proportion to their stack among
+    those left, as the exact model assumes.
+    """
+    rng = np.random.default_rng(seed)
+    chips = np.array(stacks, dtype=float)
+    places = min(len(payouts), len(stacks))
+    keys = np.log(rng.random((trials, len(stacks)))) / chips  # Log of u ** (1 / stack)
+    order = np.argsort(-keys, axis=1)[:, :places]  # Players in finishing order
+    equity = np.zeros(len(stacks))
+    for place in range(places):
+        equity += np.bincount(order[:, place], minlength=len(stacks)) * payouts[place]
+    return equity / trials
+
+
+@functools.lru_cache(maxsize=4096)
+def cached_equity(stacks: tuple, payouts: tuple) -> tuple:
+    """Return the ICM equity of positive stacks, remembering recent results."""
+    if len(stacks) <= MAX_EXACT:
+        return tuple(exact_equity(stacks, payouts).tolist())
+    return tuple(sampled_equity(stacks, payouts).tolist())
+
+
+def icm_equity(stacks: list[int], payouts: list[float]) -> list[float]:
+    """Return the prize equity of every stack for payouts listed from first place down.
+
+    Empty stacks are worth nothing. Fields up to MAX_EXACT players are
+    solved exactly, and larger ones are sampled with a fixed seed.
+    """
+    if any(stack < 0 for stack in stacks):
+        raise ValueError("Stacks cannot be negative")
+    if any(payout < 0 for payout in payouts):
+        raise ValueError("Payouts cannot be negative")
+    alive = [index for index, stack in enumerate(stacks) if stack > 0]
+    equity = [0.0] * len(stacks)
+    if not alive:
+        return equity
+    values = cached_equity(tuple(stacks[index] for index in alive), tuple(payouts[:len(alive)]))
+    for index, value in zip(alive, values):
+        equity[index] = value
+    return equity
+
+
+def group_equity(players, payouts: list[float]) -> dict[int, float]:
+    """Return the ICM equity of every player of a PlayerGroup by player ID."""
+    return dict(zip((player.id for player in players),
+                    icm_equity([player.balance for player in players], payouts)))
+
+
+def all_in_equity(stacks: list[int], payouts: list[float], hero: int, villain: int,
+                  win_probability: float) -> tuple[float, float]:
+    """Return the hero's ICM equity when calling an all-in from villain and when folding.
+
+    The caller's fold keeps the current stacks. Calling risks the smaller
+    of the two stacks, won with win_probability, and ties are ignored.
+    """
+    at_risk = min(stacks[hero], stacks[villain])
+    won, lost = list(stacks), list(stacks)
+    won[hero] += at_risk
+    won[villain] -= at_risk
+    lost[hero] -= at_risk
+    lost[villain] += at_risk
+    call = (win_probability * icm_equity(won, payouts)[hero]
+            + (1 - win_probability) * icm_equity(lost, payouts)[hero])
+    return call, icm_equity(stacks, payouts)[hero]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Independent Chip Model equity of tournament stacks.")
+    parser.add_argument("stacks", type=int, nargs="+", help="chips of every player")
+    parser.add_argument("--payouts", type=float, nargs="+", default=[50, 30, 20],
+                        help="prize of each place from first down")
+    parser.add_argument("--sample", action="store_true", help="sample finishing orders instead")
+    parser.add_argument("--trials", type=int, default=SAMPLE_TRIALS)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the sampled orders")
+    arguments = parser.parse_args()
+
+    if arguments.sample:
+        equity = sampled_equity(tuple(arguments.stacks), tuple(arguments.payouts), arguments.trials, arguments.seed)
+    else:
+        equity = icm_equity(arguments.stacks, arguments.payouts)
+    total = sum(arguments.stacks)
+    for index, (stack, value) in enumerate(zip(arguments.stacks, equity)):
+        print(f"Player {index + 1}: {stack} chips ({stack / total:.1%}) ICM equity {value:.3f}")
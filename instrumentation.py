@@ -0,0 +1,229 @@
+"""Timers and counters around the phases of a hand, with opt-in per-hand profiling.
+
+instrument() swaps timed wrappers in for the engine's phase functions and
+remove() restores them, so an engine that is not instrumented runs the
+original functions at no extra cost. Generator phases are timed only while
+they run, not while they wait for a decision, and timers are inclusive: the
+preflop timer also counts the turns and dealing inside it.
+"""
+import argparse
+import cProfile
+import functools
+import inspect
+import json
+import os
+import random
+import time
+
+import cards
+import poker
+
+# Functions to time: owner, attribute and timer name
+TARGETS = [
+    (poker, "preflop", "preflop"),
+    (poker, "flop", "flop"),
+    (poker, "turn", "turn"),
+    (poker, "river", "river"),
+    (poker, "turns", "turns"),
+    (poker, "showdown", "showdown"),
+    (poker, "settle_pots", "settle_pots"),
+    (poker.MainPot, "add_pot", "add_pot"),
+    (poker.MainPot, "add_side_pot", "add_side_pot"),
+    (poker.PlayerGroup, "final_score", "evaluate"),
+    (cards.Deck, "deal", "deal"),
+]
+
+
+class Metrics:
+    """Counters and timers aggregated in memory, exported as periodic snapshots."""
+
+    def __init__(self, export=None, interval: float = 10.0) -> None:
+        """Initialize empty metrics, passing a snapshot to export every interval seconds."""
+        self.counters = {}  # Name to count
+        self.timers = {}  # Name to [calls, total ns, longest ns]
+        self.export = export
+        self.interval = interval
+        self.last_export = time.monotonic()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name: str, elapsed: int) -> None:
+        """Add one timed call of elapsed nanoseconds to a timer."""
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, elapsed, elapsed]
+        else:
+            timer[0] += 1
+            timer[1] += elapsed
+            if elapsed > timer[2]:
+                timer[2] = elapsed
+
+    def snapshot(self) -> dict:
+        """Return the current counters and timers as plain data."""
+        return {
+            "time": time.time(),
+            "counters": dict(self.counters),
+            "timers": {name: {"calls": calls, "total_ms": total / 1e6,
+                              "mean_us": total / calls / 1e3, "max_us": longest / 1e3}
+                       for name, (calls, total, longest) in self.timers.items()},
+        }
+
+    def tick(self) -> None:
+        """Export a snapshot if the export interval has passed."""
+        if self.export is not None and time.monotonic() - self.last_export >= self.interval:
+            self.export(self.snapshot())
+            self.last_export = time.monotonic()
+
+    def reset(self) -> None:
+        """Clear every counter and timer."""
+        self.counters.clear()
+        self.timers.clear()
+
+
+def jsonl_exporter(path: str):
+    """Return an export function appending each snapshot to a JSON lines file."""
+    def export(snapshot: dict) -> None:
+        with open(path, "a") as file:
+            file.write(json.dumps(snapshot) + "\n")
+    return export
+
+
+def timed(metrics: Metrics, name: str):
+    """Decorator timing a function or generator into the named timer."""
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                clock = time.perf_counter_ns
+                start = clock()
+                steps = func(*args, **kwargs)
+                elapsed = 0
+                value = None
+                try:
+                    while True:
+                        request = steps.send(value)
+                        elapsed += clock() - start  # Time until the generator paused
+                        value = yield request
+                        start = clock()
+                except StopIteration as result:
+                    elapsed += clock() - start
+                    return result.value
+                finally:
+                    metrics.record(name, elapsed)  # Also when the caller stops early
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+def instrumented_hand(metrics: Metrics, func, profile_dir: str | None, threshold: float):
+    """Wrap the hand generator to time and count hands and their decisions.
+
+    With a profile directory, every hand runs under cProfile and hands
+    slower than threshold seconds have their profile dumped there.
+    """
+    @functools.wraps(func)
+    def hand(*args, **kwargs):
+        clock = time.perf_counter_ns
+        profile = cProfile.Profile() if profile_dir else None
+        steps = func(*args, **kwargs)
+        elapsed = 0
+        value = None
+        try:
+            while True:
+                start = clock()
+                if profile:
+                    profile.enable()
+                try:
+                    request = steps.send(value)
+                finally:
+                    if profile:
+                        profile.disable()
+                    elapsed += clock() - start
+                metrics.count("decisions")
+                value = yield request
+        except StopIteration as result:
+            metrics.record("hand", elapsed)
+            metrics.count("hands")
+            if profile and elapsed > threshold * 1e9:
+                metrics.count("profiles")
+                profile.dump_stats(os.path.join(profile_dir, f"hand-{metrics.counters['hands']}.prof"))
+            metrics.tick()
+            return result.value
+    return hand
+
+
+class Instrumentation:
+    """Timed wrappers installed on the engine until remove is called."""
+
+    def __init__(self, metrics: Metrics, profile_dir: str | None = None, threshold: float = 0.01) -> None:
+        """Install timers on every target, and per-hand profiling if a directory is given."""
+        self.metrics = metrics
+        self.originals = []  # (owner, attribute, original function)
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        for owner, attribute, name in TARGETS:
+            self.replace(owner, attribute, timed(metrics, name)(getattr(owner, attribute)))
+        self.replace(poker, "hand", instrumented_hand(metrics, poker.hand, profile_dir, threshold))
+
+    def replace(self, owner, attribute: str, wrapper) -> None:
+        """Swap a wrapper in for an attribute, remembering the original."""
+        self.originals.append((owner, attribute, getattr(owner, attribute)))
+        setattr(owner, attribute, wrapper)
+
+    def remove(self) -> None:
+        """Restore every original function."""
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+
+    def __enter__(self) -> "Instrumentation":
+        """Return the instrumentation for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Remove the instrumentation at the end of a with statement."""
+        self.remove()
+
+
+def instrument(metrics: Metrics, profile_dir: str | None = None, threshold: float = 0.01) -> Instrumentation:
+    """Time the engine's phases into metrics until the returned object is removed."""
+    return Instrumentation(metrics, profile_dir, threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless hands and report where the time goes.")
+    parser.add_argument("--hands", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile-dir", help="dump cProfile stats of slow hands here")
+    parser.add_argument("--threshold-ms", type=float, default=5.0, help="hands slower than this are profiled")
+    parser.add_argument("--export", help="append periodic snapshots to this JSON lines file")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between snapshots")
+    arguments = parser.parse_args()
+
+    metrics = Metrics(jsonl_exporter(arguments.export) if arguments.export else None, arguments.interval)
+    rng = random.Random(arguments.seed)
+    players = poker.PlayerGroup(arguments.players, 1_000_000)  # Deep enough that nobody busts
+    strategies = {player.id: poker.RandomStrategy(random.Random(rng.getrandbits(32))) if seat % 2
+                  else poker.PassiveStrategy() for seat, player in enumerate(players)}
+    deck = cards.Deck(seed=arguments.seed)
+    with instrument(metrics, arguments.profile_dir, arguments.threshold_ms / 1000):
+        for number in range(arguments.hands):
+            poker.play_hand(players, number % len(players), strategies, deck=deck)
+
+    snapshot = metrics.snapshot()
+    print(f"{'phase':<14}{'calls':>10}{'total ms':>12}{'mean us':>10}{'max us':>10}")
+    for name, timer in sorted(snapshot["timers"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<14}{timer['calls']:>10}{timer['total_ms']:>12.1f}"
+              f"{timer['mean_us']:>10.1f}{timer['max_us']:>10.1f}")
+    print(snapshot["counters"])
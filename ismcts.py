@@ -0,0 +1,229 @@
+"""Information-set Monte Carlo tree search bot that thinks for a fixed time per decision.
+
+Each iteration deals the cards the bot cannot see at random, consistent
+with its own hole cards and the community cards, and plays the hand out
+on a GameState with the engine's betting rules. Tree nodes are keyed by
+the public state alone, so every deal of the hidden cards shares one tree
+and what was searched on one street is still there on the next.
+"""
+import argparse
+import math
+import random
+import time
+from typing import NamedTuple
+
+from cards import CARD_INDEX, Deck
+from gamestate import GameState
+from poker import (ALL_IN, BET, CALL, CHECK, FOLD, RAISE, ActionRequest, Decision, PassiveStrategy,
+                   PlayerGroup, RandomStrategy, minimum_raise, no_sink, play_hand)
+
+BUDGET = 0.05  # Seconds of search per decision
+EXPLORATION = 0.7  # UCB exploration constant, rewards being in stacks of the largest starting stack
+
+
+class SearchStats(NamedTuple):
+    """What one decision's search did."""
+    iterations: int  # Hands played out
+    nodes: int  # States visited, in the tree and in the playouts
+    seconds: float  # Wall-clock time of the search
+    reused: int  # Visits the root already had from earlier decisions of the hand
+    tree_size: int  # Public states in the tree afterwards
+
+    @property
+    def nodes_per_second(self) -> float:
+        """States visited per second of search."""
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class Node:
+    """Statistics of the decisions from one public state."""
+
+    __slots__ = ("visits", "edges")
+
+    def __init__(self, decisions: list[Decision]) -> None:
+        """Initialize the node with no visits to any decision."""
+        self.visits = 0
+        self.edges = {decision: [0, 0.0] for decision in decisions}  # Decision to [visits, total reward]
+
+
+def candidate_decisions(state: GameState) -> list[Decision]:
+    """Return the decisions the search considers for the player to act.
+
+    Bets are half the pot or the pot and raises the minimum or the pot,
+    skipping sizes that would put the player all in, which ALL IN already
+    covers. Folding is left out when checking is free.
+    """
+    actor = state.actor
+    balance, bet = state.balances[actor], state.bets[actor]
+    pot = state.pot
+    options = state.legal_actions()
+    decisions = []
+    for option in options:
+        if option == BET:
+            sizes = {max(bet + 1, pot // 2), max(bet + 1, pot)}
+        elif option == RAISE:
+            lowest = minimum_raise(state.round_bet)
+            sizes = {lowest, max(lowest, state.round_bet + pot)}
+        elif option == FOLD and CHECK in options:
+            continue
+        else:
+            decisions.append(Decision(option))
+            continue
+        decisions += [Decision(option, amount) for amount in sorted(sizes) if amount - bet < balance]
+    return decisions
+
+
+def playout_decision(state: GameState, rng: random.Random) -> Decision:
+    """Return a cheap random decision for the playouts: mostly checks and calls."""
+    options = state.legal_actions()
+    roll = rng.random()
+    if CHECK in options:
+        if roll < 0.8 or BET not in options:
+            return Decision(CHECK)
+        actor = state.actor
+        bet = state.bets[actor]
+        return Decision(BET, min(bet + state.balances[actor], max(bet + 1, state.pot // 2)))
+    if roll < 0.25:
+        return Decision(FOLD)
+    if roll < 0.95 or ALL_IN not in options:
+        return Decision(CALL)
+    return Decision(ALL_IN)
+
+
+class ISMCTSStrategy:
+    """Strategy that searches every decision by information-set MCTS for a time budget.
+
+    The search stops at budget seconds, or after iterations playouts if
+    that is given, and plays the decision tried most. With no time budget
+    the search depends only on the iterations and rng, so a reseeded bot
+    plays a hand the same way again. The tree is kept until a new hand is
+    dealt.
+    """
+
+    def __init__(self, budget: float | None = BUDGET, iterations: int | None = None,
+                 exploration: float = EXPLORATION, rng: random.Random | None = None) -> None:
+        """Initialize the strategy with its budgets and its own random number generator."""
+        if budget is None and iterations is None:
+            raise ValueError("The search needs a time budget, an iteration budget or both")
+        if budget is not None and budget <= 0 or iterations is not None and iterations <= 0:
+            raise ValueError("Budgets must be positive")
+        self.budget = budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rng = rng or random.Random()
+        self.tree = {}  # Public state key to Node
+        self.hand = None  # Table and hand number the tree was built for
+        self.stats = None  # SearchStats of the last decision
+        self.history = []  # SearchStats of every decision
+
+    def decide(self, request: ActionRequest) -> Decision:
+        """Search the decision until the budget runs out and play the most tried one."""
+        started = time.perf_counter()
+        deadline = started + self.budget if self.budget is not None else math.inf
+        player = request.player
+        players = list(player.group)
+        seats = len(players)
+        me = players.index(player)
+        hand = (player.group, player.group.hands_dealt)
+        if hand != self.hand:
+            self.tree = {}  # A new hand: nothing searched before applies
+            self.hand = hand
+
+        shown = [CARD_INDEX[card] for card in request.community_card]
+        known = player.hand_mask
+        for index in shown:
+            known |= 1 << index
+        unseen = [index for index in range(52) if not known >> index & 1]
+        missing = 5 - len(shown) + 2 * (seats - 1)  # Board cards to come and opponents' hole cards
+        root = GameState.from_request(request, (0,) * seats, ())
+        stacks = [balance + bet + contribution for balance, bet, contribution
+                  in zip(root.balances, root.bets, root.contributions)]  # Chips at the start of the hand
+        scale = max(stacks)
+        root_key = root.public_key
+        root_node = self.tree.get(root_key)
+        reused = root_node.visits if root_node else 0
+
+        rng, tree, exploration = self.rng, self.tree, self.exploration
+        iterations = nodes = 0
+        while time.perf_counter() < deadline and iterations != self.iterations:
+            dealt = rng.sample(unseen, missing)
+            hands = [0] * seats
+            for seat, offset in zip((seat for seat in range(seats) if seat != me), range(0, missing, 2)):
+                hands[seat] = 1 << dealt[offset] | 1 << dealt[offset + 1]
+            hands[me] = player.hand_mask
+            state = root.with_cards(hands, shown + dealt[2 * (seats - 1):])
+
+            # Selection and expansion: follow UCB until a decision never tried
+            path = []
+            while not state.terminal:
+                node = tree.get(state.public_key)
+                if node is None:
+                    node = tree[state.public_key] = Node(candidate_decisions(state))
+                untried = [decision for decision, edge in node.edges.items() if not edge[0]]
+                if untried:
+                    decision = rng.choice(untried)
+                else:
+                    log_visits = math.log(node.visits)
+                    decision = max(node.edges, key=lambda choice: (
+                        node.edges[choice][1] / node.edges[choice][0]
+                        + exploration * math.sqrt(log_visits / node.edges[choice][0])))
+                path.append((node, decision, state.actor))
+                state = state.apply(decision)
+                nodes += 1
+                if untried:
+                    break
+
+            # Playout to the end of the hand
+            while not state.terminal:
+                state = state.apply(playout_decision(state, rng))
+                nodes += 1
+
+            for node, decision, actor in path:
+                edge = node.edges[decision]
+                node.visits += 1
+                edge[0] += 1
+                edge[1] += (state.balances[actor] - stacks[actor]) / scale
+            iterations += 1
+
+        root_node = tree.get(root_key)
+        if root_node and root_node.visits:
+            decision = max(root_node.edges, key=lambda choice: root_node.edges[choice][0])
+        else:
+            decision = Decision(CHECK if CHECK in request.options else CALL)  # No time to search at all
+        self.stats = SearchStats(iterations, nodes, time.perf_counter() - started, reused, len(tree))
+        self.history.append(self.stats)
+        return decision
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play the ISMCTS bot against simple bots and report its speed.")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET * 1000, help="search time per decision")
+    parser.add_argument("--hands", type=int, default=50)
+    parser.add_argument("--opponents", nargs="+", choices=["random", "passive"], default=["random", "passive"])
+    parser.add_argument("--balance", type=int, default=100, help="starting balance of every seat")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    bot = ISMCTSStrategy(arguments.budget_ms / 1000, rng=random.Random(arguments.seed))
+    makers = {"random": lambda: RandomStrategy(random.Random(rng.random())), "passive": PassiveStrategy}
+    names = ["ISMCTS"] + [name.capitalize() for name in arguments.opponents]
+    deck = Deck()
+    won = 0
+    for number in range(arguments.hands):
+        # A fresh table every hand, so nobody busts and the button rotates through every seat
+        players = PlayerGroup(len(names), arguments.balance, names)
+        strategies = {players[0].id: bot}
+        strategies |= {player.id: makers[name]() for player, name in zip(players[1:], arguments.opponents)}
+        deck.reset(rng.getrandbits(32))
+        play_hand(players, number % len(names), strategies, no_sink, deck)
+        won += players[0].balance - arguments.balance
+
+    history = bot.history
+    seconds = sum(stats.seconds for stats in history)
+    nodes = sum(stats.nodes for stats in history)
+    print(f"{arguments.hands} hands, {len(history)} decisions, chips won {won:+d}")
+    if history:
+        print(f"{nodes / seconds:,.0f} nodes/s, {sum(stats.iterations for stats in history) / len(history):,.0f} "
+              f"playouts and {seconds / len(history) * 1000:.1f} ms per decision "
+              f"(longest {max(stats.seconds for stats in history) * 1000:.1f} ms)")
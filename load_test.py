@@ -0,0 +1,94 @@
+"""Load-test client playing many bot connections against the poker server."""
+import argparse
+import asyncio
+import random
+import time
+
+from poker import BET, CALL, CHECK, RAISE
+
+
+class Results:
+    """Counters shared by every bot of a load test."""
+
+    def __init__(self) -> None:
+        """Initialize the counters at zero."""
+        self.decisions = 0  # ACT prompts answered
+        self.hands = 0  # STACKS lines, one per player per finished hand
+        self.finished = 0  # Bots whose table ended
+        self.unseated = 0  # Bots never seated before the join timeout
+
+
+def choose(words: list[str], rng: random.Random) -> str:
+    """Return the answer of a bot to an ACT prompt, mostly checking or calling."""
+    options = words[1].split(",")
+    round_bet, minimum_raise, _, bet, balance = map(int, words[2:])
+    roll = rng.random()
+    if roll < 0.1 and BET in options:
+        return f"BET {rng.randint(1, bet + balance)}"
+    if roll < 0.1 and RAISE in options:
+        return f"RAISE {rng.randint(minimum_raise, bet + balance)}"
+    if roll < 0.15:
+        return "FOLD"
+    return CHECK if CHECK in options else CALL
+
+
+async def bot(host: str, port: int, name: str, rng: random.Random, results: Results,
+              join_timeout: float) -> None:
+    """Join a table and answer every prompt until the table ends or no seat comes in time."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"JOIN {name}\n".encode())
+    try:
+        line = await asyncio.wait_for(reader.readline(), join_timeout)  # SEATED once the table fills
+    except asyncio.TimeoutError:
+        results.unseated += 1
+        writer.close()
+        return
+    while line:
+        words = line.decode().split()
+        if words[0] == "ACT":
+            writer.write(choose(words, rng).encode() + b"\n")
+            results.decisions += 1
+        elif words[0] == "STACKS":
+            results.hands += 1
+        elif words[0] == "END":
+            break
+        line = await reader.readline()
+    results.finished += 1
+    writer.close()
+
+
+async def load_test(host: str, port: int, clients: int, seats: int, seed: int,
+                    join_timeout: float = 30.0) -> None:
+    """Connect the bots at once and report throughput when every table has ended.
+
+    The clients must fill whole tables of the server's seats, since a
+    partial table never starts; bots still unseated after join_timeout
+    seconds give up.
+    """
+    if clients <= 0 or clients % seats:
+        raise ValueError(f"{clients} clients do not fill whole tables of {seats} seats")
+    results = Results()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(bot(host, port, f"bot{index}", random.Random(rng.random()), results, join_timeout)
+                           for index in range(clients)))
+    elapsed = time.perf_counter() - start
+    print(f"{clients} clients, {results.finished} finished, {results.unseated} unseated in {elapsed:.1f} s")
+    print(f"{results.decisions / elapsed:,.0f} decisions/s, "
+          f"{results.hands / elapsed:,.0f} player hands/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive a local poker server with bot clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--clients", type=int, default=600, help="bots to connect, whole tables only")
+    parser.add_argument("--seats", type=int, default=6, help="players per table on the server")
+    parser.add_argument("--join-timeout", type=float, default=30.0, help="seconds a bot waits for a seat")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the bots' choices")
+    arguments = parser.parse_args()
+
+    if arguments.seats <= 0 or arguments.clients % arguments.seats:
+        parser.error(f"--clients must be a multiple of --seats ({arguments.seats})")
+    asyncio.run(load_test(arguments.host, arguments.port, arguments.clients, arguments.seats,
+                          arguments.seed, arguments.join_timeout))
@@ -0,0 +1,149 @@
+"""Outs on the flop and turn: what every unseen card does to a hand and its opponents."""
+import argparse
+from typing import NamedTuple
+
+from cards import CARD_INDEX, INDEX_CARD, SUIT_TEXT, VALUE_TEXT, cards_to_mask, parse_card
+from evaluator import CARD_KEY, CARD_KEYS, evaluate_key, hand_category
+from poker import SCORE_RANK
+
+
+class HandState:
+    """Evaluator key of a hand's cards and the board so far, extended card by card.
+
+    The key of the current 5 or 6 cards is kept, so the hand after any
+    further card costs one addition and one table lookup instead of
+    summing every card again.
+    """
+
+    __slots__ = ("key", "mask", "strength")
+
+    def __init__(self, cards) -> None:
+        """Initialize the state from (value, suit) cards."""
+        self.key = sum(CARD_KEY[card] for card in cards)
+        self.mask = cards_to_mask(cards)
+        self.strength = evaluate_key(self.key)
+
+    def add(self, card: tuple) -> None:
+        """Add a newly dealt card to the state."""
+        self.key += CARD_KEY[card]
+        self.mask |= 1 << CARD_INDEX[card]
+        self.strength = evaluate_key(self.key)
+
+    def strength_with(self, index: int) -> int:
+        """Return the strength ordinal the hand would have with one more card index."""
+        return evaluate_key(self.key + CARD_KEYS[index])
+
+
+class CardOutcome(NamedTuple):
+    """What one unseen card would do to a hand."""
+    card: tuple  # (value, suit) card
+    strength: int  # Strength ordinal of the hand with the card
+    category: int  # SCORE_RANK category of the hand with the card
+    improves: bool  # Whether the card lifts the hand to a better category
+    beats: tuple[bool, ...]  # Whether the hand then beats each opponent outright
+
+
+class OutsTracker:
+    """Hand states of a hand and its known opponents, carried from the flop to the turn.
+
+    Each hand is evaluated once as a HandState; dealing the turn adds the
+    card to those states instead of scoring the hands again.
+    """
+
+    def __init__(self, hand: set, community_card: set, opponents: list[set] = ()) -> None:
+        """Initialize the states from the hole cards and 3 or 4 community cards."""
+        if len(hand) != 2:
+            raise ValueError("A hand must hold exactly 2 cards")
+        if len(community_card) not in (3, 4):
+            raise ValueError("Outs are counted on the flop or turn, with 3 or 4 community cards")
+        known = set(hand) | set(community_card)
+        for opponent in opponents:
+            if len(opponent) != 2 or known & set(opponent):
+                raise ValueError("Each opponent hand must hold 2 cards unseen elsewhere")
+            known |= set(opponent)
+        self.board_size = len(community_card)
+        self.dead = cards_to_mask(known)  # Cards that can no longer be dealt
+        self.hero = HandState(set(hand) | set(community_card))
+        self.villains = [HandState(set(opponent) | set(community_card)) for opponent in opponents]
+
+    def deal(self, card: tuple) -> None:
+        """Add the turn card to every hand state."""
+        if self.board_size != 3:
+            raise ValueError("Only the turn is dealt after the flop")
+        if self.dead >> CARD_INDEX[card] & 1:
+            raise ValueError("The card is already dealt")
+        self.board_size += 1
+        self.dead |= 1 << CARD_INDEX[card]
+        self.hero.add(card)
+        for villain in self.villains:
+            villain.add(card)
+
+    def outcomes(self) -> list[CardOutcome]:
+        """Return the outcome of every card still unseen, one lookup per card and hand."""
+        category = hand_category(self.hero.strength)
+        outcomes = []
+        for index in range(52):
+            if self.dead >> index & 1:
+                continue
+            strength = self.hero.strength_with(index)
+            outcomes.append(CardOutcome(
+                card=INDEX_CARD[index],
+                strength=strength,
+                category=hand_category(strength),
+                improves=hand_category(strength) > category,
+                beats=tuple(strength > villain.strength_with(index) for villain in self.villains)))
+        return outcomes
+
+
+def card_outcomes(hand: set, community_card: set, opponents: list[set] = ()) -> list[CardOutcome]:
+    """Return the outcome of every unseen card for a hand on the flop or turn.
+
+    Cards in the hand, on the board or in a known opponent hand are not dealt.
+    """
+    return OutsTracker(hand, community_card, opponents).outcomes()
+
+
+def helping_cards(outcomes: list[CardOutcome]) -> list[tuple]:
+    """Return the cards of outcomes that improve the hand, or beat every opponent if any are known."""
+    if outcomes and outcomes[0].beats:
+        return [outcome.card for outcome in outcomes if all(outcome.beats)]
+    return [outcome.card for outcome in outcomes if outcome.improves]
+
+
+def outs(hand: set, community_card: set, opponents: list[set] = ()) -> list[tuple]:
+    """Return the unseen cards that help a hand on the flop or turn.
+
+    Without opponents these are the cards that improve the hand's category.
+    With known opponent hands they are the cards after which the hand beats
+    every opponent outright.
+    """
+    return helping_cards(card_outcomes(hand, community_card, opponents))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List what every unseen card does to a hand.")
+    parser.add_argument("hand", help='hole cards such as "Ah Kh"')
+    parser.add_argument("board", help='3 or 4 community cards such as "Qh 7h 2c"')
+    parser.add_argument("opponents", nargs="*", help='opponent hole cards such as "QsQd"')
+    parser.add_argument("--turn", help="show the outs again once this card is dealt on the flop")
+    arguments = parser.parse_args()
+
+    def read_cards(text: str) -> set:
+        text = text.replace(" ", "")
+        return {parse_card(text[start:start + 2]) for start in range(0, len(text), 2)}
+
+    def show(outcomes: list[CardOutcome]) -> None:
+        helped = set(helping_cards(outcomes))
+        for outcome in outcomes:
+            marks = " ".join("wins" if beat else "-" for beat in outcome.beats)
+            print(f"{VALUE_TEXT[outcome.card[0]]}{SUIT_TEXT[outcome.card[1]]}  "
+                  f"{SCORE_RANK[outcome.category]:<20}{'out ' if outcome.card in helped else '    '}{marks}")
+        print(f"{len(helped)} outs of {len(outcomes)} unseen cards")
+
+    tracker = OutsTracker(read_cards(arguments.hand), read_cards(arguments.board),
+                          [read_cards(text) for text in arguments.opponents])
+    show(tracker.outcomes())
+    if arguments.turn:
+        tracker.deal(parse_card(arguments.turn))
+        print(f"After the turn {arguments.turn}")
+        show(tracker.outcomes())
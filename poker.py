@@ -1,6 +1,10 @@
-import numpy as np
+import argparse
 import random
 import time
+from typing import NamedTuple
+
+from cards import Deck, cards_to_mask, mask_to_cards
+from evaluator import evaluate, evaluate_key, hand_category, mask_key
 
 # Constants for card values and suits
 VAL_RANK = {
@@ -16,84 +20,64 @@ SCORE_RANK = {
     8: "Four of a kind", 9: "The Straight Flush", 10: "The Royal Flush"
 }
 
-# Predefined card combinations for poker hands
-# List of pairs representing the ranks of cards in poker (1 = Ace, 2 = 2, ..., 4 = 4)
-pair_list = [[1, 2], [1, 3], [1, 4], [2, 3], [2, 4], [3, 4]]
-# List of triplets representing three of a kind card combinations
-three_list = [[1, 2, 3], [2, 3, 4], [1, 2, 4], [1, 3, 4]]
-
-# Create a NumPy array for pairs of cards
-# For each value from 2 to 14 (Ace), create pairs using the pair_list
-pair = np.array([[[val, suit] for pair in pair_list for suit in pair]
-                 for val in range(2, 15)])  # Loop through each card value
-# Reshape the array to have 78 entries, with each entry containing 2 pairs of suits
-pair = np.reshape(pair, (78, 2, 2))
-
-# Create a NumPy array for three of a kind card combinations
-three = np.array(
-    # Loop through each card value
-    [[[val, suit] for three in three_list for suit in three] for val in range(2, 15)])
-# Reshape the array to have 52 entries, with each entry containing 3 cards
-three = np.reshape(three, (52, 3, 2))
-
-# Create a NumPy array for four of a kind card combinations
-# For each value from 2 to 14, create all possible suits (1-4)
-four = np.array([[[val, suit] for suit in range(1, 5)]
-                 for val in range(2, 15)])  # Loop through each card value
-
-# List of possible straight combinations in poker
-straight_list = [
-    [14, 2, 3, 4, 5],  # Ace as the highest card in the straight
-    [2, 3, 4, 5, 6],   # Straight starting from 2 to 6
-    [3, 4, 5, 6, 7],   # Straight from 3 to 7
-    [4, 5, 6, 7, 8],   # Straight from 4 to 8
-    [5, 6, 7, 8, 9],   # Straight from 5 to 9
-    [6, 7, 8, 9, 10],  # Straight from 6 to 10
-    [7, 8, 9, 10, 11],  # Straight from 7 to Jack
-    [8, 9, 10, 11, 12],  # Straight from 8 to Queen
-    [9, 10, 11, 12, 13],  # Straight from 9 to King
-    [10, 11, 12, 13, 14]  # Straight from 10 to Ace
-]
-
-# Create a NumPy array for straight flush combinations
-# For each straight combination, create all possible suits (1-4)
-straight_flush = np.array(
-    [[[val, suit] for straight in straight_list for val in straight] for suit in range(1, 5)])
-# Reshape the array to have 40 entries, with each entry containing 5 cards
-straight_flush = np.reshape(straight_flush, (40, 5, 2))
-
-# Create a NumPy array for royal flush combinations
-# Royal flush consists of the highest cards (10, Jack, Queen, King, Ace) in each suit
-royal_flush = np.array(
-    # Loop through each suit
-    [[[val, suit] for val in range(10, 15)] for suit in range(1, 5)])
-
-
-def show_card(cards: set) -> str:
-    """Return a string representation of the cards."""
+# Actions a strategy can choose, named as the players type them
+CHECK, BET, CALL, RAISE, FOLD, ALL_IN = "CHECK", "BET", "CALL", "RAISE", "FOLD", "ALL IN"
+
+
+class Decision(NamedTuple):
+    """Action chosen by a strategy for its player's turn."""
+    action: str  # One of the action constants
+    amount: int = 0  # Total bet for BET and RAISE
+
+
+class ActionRequest(NamedTuple):
+    """Everything a strategy is shown when its player has to act."""
+    player: "Player"  # Player to act
+    options: tuple[str, ...]  # Legal actions
+    round_bet: int  # Current round bet
+    minimum_raise: int  # Lowest total bet a RAISE may reach
+    total_pot: int  # Chips already collected in the main pot
+    community_card: set  # Community cards dealt so far
+    preflop: bool  # Whether this is the preflop betting round
+
+
+def show_card(cards: set | int) -> str:
+    """Return a string representation of the cards or of a card mask."""
+    if isinstance(cards, int):
+        cards = mask_to_cards(cards)  # Convert a card mask to (value, suit) cards
     card_string = ""
     for card in cards:
         card_string += f"({VAL_RANK[card[0]]}, {SUIT_RANK[card[1]]}), "
     return card_string[:-2]  # Remove trailing comma and space
 
 
-def draw_card(deck_of_cards: set, number_of_cards: int) -> set:
-    """Draw a specified number of cards from the deck."""
-    cards = set()
-    for _ in range(number_of_cards):
-        card = random.choice(tuple(deck_of_cards))  # Randomly select a card
-        cards.add(card)  # Add card to drawn cards
-        deck_of_cards.remove(card)  # Remove card from deck
-    return cards
+def new_deck() -> set:
+    """Return a full deck of 52 (value, suit) cards."""
+    return {(val, suit) for suit in SUIT_RANK for val in VAL_RANK}
+
+
+def no_sink(event: str, **fields) -> None:
+    """Discard a game event, the default sink for headless play."""
+    return
 
 
 class Player:
-    """Class representing a player in the poker game."""
+    """Class representing a player in the poker game.
+
+    Attributes live in fixed slots rather than a dict. Folding and going all
+    in update the counts of the player's group, so the group can answer
+    how many players are still live in O(1). Setting the hand also sets its
+    evaluator key, which added to the group's board key gives the player's
+    strength on the cards dealt so far.
+    """
     counter = 1  # Class variable to keep track of player IDs
+    __slots__ = ("id", "name", "balance", "bet", "final_score", "score", "win", "contribution",
+                 "_fold_status", "_all_in", "lose", "_hand_mask", "hand_key", "final_mask", "group")
 
     def __init__(self, balance: int) -> None:
         """Initialize player with a balance and other attributes."""
         self.id = Player.counter  # Assign player ID
+        self.group = None  # PlayerGroup counting the player's status
         self.name = ""  # Player's name
         self.balance = balance  # Player's balance
         self.bet = 0  # Current bet
@@ -101,13 +85,72 @@ class Player:
         self.score = 0
         # Current score based on hand ranking
         self.win = 0  # Total winnings
-        self.fold_status = False  # Status if player has folded
-        self.all_in = False  # Status if player is all in
+        self.contribution = 0  # Chips put into the pot this hand
+        self._fold_status = False  # Status if player has folded
+        self._all_in = False  # Status if player is all in
         self.lose = False  # Status if player has lost
-        self.cards = set()  # Cards held by the player
-        self.final_cards = set()  # Final cards including community cards
+        self.hand_mask = 0  # Card mask of the cards held by the player, which sets hand_key
+        self.final_mask = 0  # Card mask of the final cards including community cards
         Player.counter += 1  # Increment player ID counter
 
+    @property
+    def fold_status(self) -> bool:
+        """Whether the player has folded this hand."""
+        return self._fold_status
+
+    @fold_status.setter
+    def fold_status(self, folded: bool) -> None:
+        if folded != self._fold_status:
+            self._fold_status = folded
+            if self.group is not None:
+                self.group.folded_count += 1 if folded else -1
+
+    @property
+    def all_in(self) -> bool:
+        """Whether the player has bet the whole balance this hand."""
+        return self._all_in
+
+    @all_in.setter
+    def all_in(self, all_in: bool) -> None:
+        if all_in != self._all_in:
+            self._all_in = all_in
+            if self.group is not None:
+                self.group.all_in_count += 1 if all_in else -1
+
+    @property
+    def hand_mask(self) -> int:
+        """Card mask of the cards held by the player."""
+        return self._hand_mask
+
+    @hand_mask.setter
+    def hand_mask(self, mask: int) -> None:
+        self._hand_mask = mask
+        self.hand_key = mask_key(mask)  # Evaluator key of the hole cards
+
+    @property
+    def strength(self) -> int:
+        """Strength ordinal of the player's cards with the community cards dealt so far."""
+        board_key = self.group.board_key if self.group is not None else 0
+        return evaluate_key(self.hand_key + board_key)
+
+    @property
+    def cards(self) -> set:
+        """Cards held by the player."""
+        return mask_to_cards(self.hand_mask)
+
+    @cards.setter
+    def cards(self, cards: set) -> None:
+        self.hand_mask = cards_to_mask(cards)
+
+    @property
+    def final_cards(self) -> set:
+        """Final cards including community cards."""
+        return mask_to_cards(self.final_mask)
+
+    @final_cards.setter
+    def final_cards(self, cards: set) -> None:
+        self.final_mask = cards_to_mask(cards)
+
     def small_blind(self) -> None:
         """Place a small blind bet."""
         self.bet = 1  # Set bet to small blind amount
@@ -118,105 +161,42 @@ class Player:
         self.bet = 2  # Set bet to big blind amount
         self.balance -= 2  # Deduct from balance
 
-    def start_bet(self, round_bet: int) -> None:
-        """Handle the betting action for the player."""
-        while True:
-            print("Please enter bet amount!")
-            new_bet = input("Action (BET ($) / ALL IN / EXIT) : ").upper()
-            try:
-                if new_bet == "EXIT":
-                    print(f"{self.name} cancels the bet")
-                    return -1  # Exit betting
-                if new_bet == "ALL IN" and self.balance > 0:
-                    self.bet = self.balance  # Bet all remaining balance
-                    round_bet = self.bet  # Update round bet
-                    self.balance = 0  # Set balance to zero
-                    self.all_in = True  # Mark as all in
-                    print(f"{self.name} All in (${round_bet})")
-                    return round_bet
-                else:
-                    new_bet = int(new_bet)  # Convert input to integer
-                    if self.balance >= new_bet:
-                        self.balance -= new_bet  # Deduct bet from balance
-                        self.bet = new_bet  # Update bet
-                        round_bet = self.bet  # Update round bet
-                        print(f"{self.name} raises the bet to ${round_bet}")
-                        return round_bet
-                    else:
-                        # Insufficient balance
-                        print("Your balance is not enough!")
-            except ValueError:
-                print("Invalid bet")  # Handle invalid input
+    def raise_bet(self, new_bet: int) -> None:
+        """Bet or raise the player's total bet to the given amount."""
+        self.balance -= new_bet - self.bet  # Deduct the extra amount from balance
+        self.bet = new_bet  # Update bet
+        if self.balance == 0:
+            self.all_in = True  # Mark as all in if balance is zero
 
-    def raise_bet(self, round_bet: int) -> int:
-        """Handle raising the bet."""
-        minimum_raise = 4 if round_bet == 2 else round_bet + 1  # Determine minimum raise
-        while True:
-            print(
-                f"Please enter the amount to raise (Minimum to ${minimum_raise})!")
-            new_bet = input(f"Action (BET ($) / ALL IN / EXIT) : ").upper()
-            try:
-                if new_bet == "EXIT":
-                    print(f"{self.name} cancels the raise")
-                    return -1  # Exit raising
-                elif new_bet == "ALL IN" and (minimum_raise - self.bet) <= self.balance:
-                    self.bet += self.balance  # Bet all remaining balance
-                    round_bet = self.bet  # Update round bet
-                    self.balance = 0  # Set balance to zero
-                    self.all_in = True  # Mark as all in
-                    print(f"{self.name} ALL IN (${round_bet})!")
-                    return round_bet
-                else:
-                    new_bet = int(new_bet)  # Convert input to integer
-                    raise_amount = new_bet - self.bet  # Calculate raise amount
-                    if new_bet < minimum_raise:
-                        print("Bet is too low")  # Raise amount too low
-                    elif self.balance >= raise_amount:
-                        self.balance -= raise_amount  # Deduct raise from balance
-                        self.bet = new_bet  # Update bet
-                        round_bet = self.bet  # Update round bet
-                        if self.balance == 0:
-                            self.all_in = True  # Mark as all in if balance is zero
-                            print(f"{self.name} ALL IN (${round_bet})!")
-                        else:
-                            print(f"{self.name} raises the bet to ${round_bet}")
-                        return round_bet
-                    else:
-                        # Insufficient balance
-                        print("Your balance is not enough!")
-            except ValueError:
-                print("Invalid bet!")  # Handle invalid input
+    def all_in_bet(self) -> None:
+        """Bet all of the player's remaining balance."""
+        self.bet += self.balance  # Bet all remaining balance
+        self.balance = 0  # Set balance to zero
+        self.all_in = True  # Mark as all in
 
     def call_bet(self, round_bet: int) -> None:
         """Call the current bet."""
         call_amount = round_bet - self.bet  # Calculate call amount
         if self.balance >= call_amount:
             self.balance -= call_amount  # Deduct call amount from balance
-
             self.bet = round_bet  # Update bet to current round bet
             if self.balance == 0:
                 self.all_in = True  # Mark as all in if balance is zero
-                print(f"{self.name} ALL IN (${round_bet})!")
-            else:
-                print(f"{self.name} calls the bet (${round_bet})")
         else:
             self.fold()  # Fold if insufficient balance
 
     def fold(self) -> None:
         """Fold the player's hand."""
         self.fold_status = True  # Set fold status to True
-        print(f"{self.name} folds")  # Notify that the player has folded
-        return
 
     def check(self) -> None:
         """Check the current bet without raising."""
-        print(f"{self.name} checks")  # Notify that the player checks
-        return
+        return  # Checking leaves the bet unchanged
 
     def __repr__(self) -> str:
         """Return a string representation of the player."""
         message = (f"== {self.name} ==\nBalance: ${self.balance}\nBet: ${
-                   self.bet}\nCard: {show_card(self.cards)}")
+                   self.bet}\nCard: {show_card(self.hand_mask)}")
         return message
 
     def __len__(self):
@@ -231,74 +211,100 @@ class Player:
 class PlayerGroup:
     """Class representing a group of players."""
 
-    def __init__(self, number_of_player: int, initial_balance: int) -> None:
+    def __init__(self, number_of_player: int, initial_balance: int, names: list[str] | None = None) -> None:
         """Initialize the player group with a specified number of players and their balance."""
+        self.board_mask = 0  # Card mask of the community cards dealt so far
+        self.board_key = 0  # Evaluator key of those cards, shared by every player
+        self.button = 0  # Seat of the button in the current hand
+        self.hands_dealt = 0  # Hands dealt at this table, so strategies can tell hands apart
         self.players = [Player(initial_balance)
                         for _ in range(number_of_player)]  # Create players
-        for player in self.players:
-            # Set player names
-            player.name = input(f"Player {player.id}'s name: ")
+        for index, player in enumerate(self.players):
+            # Set player names, defaulting to the player ID
+            player.name = names[index] if names else f"Player {player.id}"
+
+    @property
+    def players(self) -> list[Player]:
+        """Players of the group in seat order."""
+        return self._players
+
+    @players.setter
+    def players(self, players: list[Player]) -> None:
+        self._players = list(players)
+        self.folded_count = 0  # Players who have folded
+        self.all_in_count = 0  # Players who are all in
+        for player in self._players:
+            player.group = self  # The player keeps the counts current from now on
+            self.folded_count += player.fold_status
+            self.all_in_count += player.all_in
 
     def remove(self, player: Player) -> None:
         """Remove a player from the group."""
-        self.players.remove(player)  # Remove specified player
+        self._players.remove(player)  # Remove specified player
+        self.folded_count -= player.fold_status
+        self.all_in_count -= player.all_in
+        player.group = None
 
     def reset_game(self) -> None:
         """Reset the game state for all players."""
         for player in self.players:
             player.win = 0  # Reset wins
+            player.contribution = 0  # Reset chips put into the pot
             player.score = 0  # Reset score
             player.fold_status = False  # Reset fold status
             player.all_in = False  # Reset all-in status
-            player.cards = set()  # Reset cards
+            player.hand_mask = 0  # Reset cards
+        self.board_mask = 0  # Clear the community cards
+        self.board_key = 0
+
+    def deal_board(self, board: int) -> None:
+        """Bring the shared board key up to date with a board mask.
+
+        Only the cards added since the last call are keyed, so following
+        the board street by street costs one key per new card.
+        """
+        if board & self.board_mask != self.board_mask:
+            self.board_mask = self.board_key = 0  # A different board, start again
+        self.board_key += mask_key(board & ~self.board_mask)
+        self.board_mask = board
 
     def all_fold(self) -> list[Player]:
         """Return a list of players who have not folded."""
         return [player for player in self.players if not player.fold_status]  # Filter active players
 
+    def live_count(self) -> int:
+        """Return the number of players who have not folded."""
+        return len(self._players) - self.folded_count
+
     def all_in(self) -> bool:
         """Check if only one player is left who is not all in."""
-        active = [
-            player for player in self.players if not player.all_in]  # Get active players
-        return len(active) <= 1  # Return True if one or no active players
+        return len(self._players) - self.all_in_count <= 1  # Return True if one or no active players
 
-    def update_status(self):
+    def update_status(self, sink=no_sink):
         """Update the status of players based on their balance."""
         for player in self.players:
             if player.balance < 2:  # If balance is less than 2
-                print(f"{player.name} lost! (Balance: ${player.balance})")
                 player.lose = True  # Mark player as lost
+                sink("lose", player=player)  # Announce the lost player
 
     def final_score(self):
-        """Calculate the final score for each player."""
+        """Calculate the final score for each player from the shared board key."""
+        board_key = self.board_key
         for player in self.players:
-            player.final_score = player.score * 10  # Calculate final score
-        for score in range(3, 0, -1):  # Check scores from high to low
-            # Filter players by score
-            player_filtered = [
-                player for player in self.players if player.score == score]
-            while len(player_filtered) > 1:  # If there's a tie
-                if score in (3, 2):
-                    win = max(player_filtered, key=lambda player: max(
-                        check_pair(player.final_cards), key=lambda card: card[0][0]))
-                elif score == 1:
-                    win = max(player_filtered, key=lambda player: max(
-                        player.cards))  # Determine winner
-                draw = {player for player in player_filtered if max(
-                    player.cards)[0] == max(win.cards)[0]}  # Check for ties
-                for player in players:
-                    if player in draw:
-                        player_filtered.remove(player)  # Remove tied players
-                    else:
-                        player.final_score -= 1  # Decrease score for non-winners
+            if player.fold_status:
+                player.final_score = 0  # Folded players cannot win a pot
+            else:
+                # Strength ordinal orders every hand, kickers included
+                player.final_score = evaluate_key(player.hand_key + board_key)
+                player.score = hand_category(player.final_score)  # Hand rank
 
     def __len__(self) -> None:
         """Return the number of players in the group."""
-        return len(self.players)
+        return len(self._players)
 
     def __getitem__(self, index) -> Player:
         """Return a player by index."""
-        return self.players[index]
+        return self._players[index]
 
     def __repr__(self) -> str:
         """Return a string representation of the player group."""
@@ -317,53 +323,125 @@ class PlayerGroup:
         return message
 
 
+def strength_tiers(scores: list[int]) -> list[list[int]]:
+    """Group the indexes of scores into tiers of equal score, best tier first.
+
+    The sort is stable, so each tier keeps the order the scores were given in.
+    """
+    tiers = []
+    for index in sorted(range(len(scores)), key=scores.__getitem__, reverse=True):
+        if not tiers or scores[tiers[-1][0]] != scores[index]:
+            tiers.append([])  # A weaker hand starts the next tier
+        tiers[-1].append(index)
+    return tiers
+
+
+def pot_layers(contributions: list[int], folded: list[bool]) -> list[list]:
+    """Split the chips of a hand into pots of [eligible indexes, chips], the main pot first.
+
+    Contributions are sorted once and every distinct level becomes one
+    pot layer that the live players who reached it can win. Chips in a
+    layer no live player reached join the pot below it, and a lowest layer
+    only folded players reached moves up to the next one, or goes to
+    every live player if there is none.
+    """
+    contributors = sorted((index for index, chips in enumerate(contributions) if chips > 0),
+                          key=contributions.__getitem__)
+    layers = []  # [eligible indexes, amount] from the main pot upwards
+    level = 0  # Contribution covered by the layers so far
+    for position, index in enumerate(contributors):
+        if contributions[index] == level:
+            continue  # Same level as the previous layer
+        amount = (contributions[index] - level) * (len(contributors) - position)
+        eligible = [other for other in contributors[position:] if not folded[other]]
+        if eligible or not layers:
+            layers.append([eligible, amount])
+        else:
+            layers[-1][1] += amount  # Nobody live reached it, so it joins the pot below
+        level = contributions[index]
+    if layers and not layers[0][0]:
+        lowest = layers.pop(0)
+        if layers:
+            layers[0][1] += lowest[1]
+        else:
+            layers.append([[index for index, fold in enumerate(folded) if not fold], lowest[1]])
+    return layers
+
+
+def split_chips(amount: int, winners: int) -> list[int]:
+    """Split chips into whole shares, odd chips going one each to the first winners."""
+    share, odd_chips = divmod(amount, winners)
+    return [share + 1 if index < odd_chips else share for index in range(winners)]
+
+
+class ShowdownRanking:
+    """Live players of a showdown grouped into tiers of equal strength, best tier first.
+
+    Players are sorted once by final_score. Players in the same tier split
+    any pot they win, and each tier keeps the order the players were given
+    in, which is seat order starting left of the button.
+    """
+
+    def __init__(self, players: list[Player]) -> None:
+        """Rank the players who have not folded by their final scores."""
+        live = [player for player in players if not player.fold_status]
+        # Lists of players holding the same strength
+        self.tiers = [[live[index] for index in tier]
+                      for tier in strength_tiers([player.final_score for player in live])]
+        # Player ID to the index of the player's tier
+        self.tier = {player.id: number for number, tier in enumerate(self.tiers) for player in tier}
+
+    def best(self, players: list[Player]) -> list[Player]:
+        """Return the players of a pot holding its best hand, in seat order."""
+        eligible = [self.tier[player.id] for player in players if player.id in self.tier]
+        if not eligible:
+            return []
+        top = min(eligible)
+        return [player for player in self.tiers[top] if player in players]
+
+    def leaderboard(self) -> list[Player]:
+        """Return the ranked players, best first."""
+        return [player for tier in self.tiers for player in tier]
+
+
 class Pot:
-    """Class representing the main pot in the game."""
+    """Class representing a pot in the game."""
 
-    def __init__(self) -> None:
-        """Initialize the pot with a total amount of zero."""
-        self.total_pot = 0  # Total amount in the pot
+    def __init__(self, players: list[Player] | None = None, total_pot: int = 0) -> None:
+        """Initialize the pot with the players eligible to win it and its amount."""
+        self.players = players or []  # Players who can win the pot
+        self.total_pot = total_pot  # Total amount in the pot
 
-    def add_pot(self, players: PlayerGroup, round_bet: int) -> None:
-        """Add bets from players to the pot."""
-        for player in players:
-            if player.bet > round_bet:
-                self.total_pot += round_bet  # Add round bet to pot
-                player.bet -= round_bet  # Deduct round bet from player's bet
-            else:
-                self.total_pot += player.bet  # Add player's bet to pot
-                player.bet = 0  # Reset player's bet
+    def share(self, winners: list[Player]) -> list[int]:
+        """Split the pot into whole chips, one share per winner.
 
-    def share(self, number_of_players: int) -> int:
-        """Distribute the pot among the winning players."""
-        amount = self.total_pot / number_of_players  # Calculate share per player
+        Odd chips go one each to the first winners, so winners must be
+        listed in seat order starting left of the button.
+        """
+        shares = split_chips(self.total_pot, len(winners))
         self.total_pot = 0  # Reset pot after distribution
-        return amount
+        return shares
+
+    def win(self, ranking: ShowdownRanking, sink=no_sink) -> dict[int, int]:
+        """Award the pot to its best eligible hands and return the chips won per player ID."""
+        draw = ranking.best(self.players)  # Winners, more than one on a tie
+        if not draw:
+            return {}  # Nobody live can win it
+        payouts = {}
+        for player, amount in zip(draw, self.share(draw)):
+            sink("pot_win", player=player, amount=amount, pot=self)  # Announce winner
+            player.win += amount  # Add winnings to player's total
+            payouts[player.id] = amount
+        return payouts
 
 
 class SidePot(Pot):
     """Class representing a side pot in the game."""
-    counter = 1  # Class variable to keep track of side pot IDs
-
-    def __init__(self, players: list[Player], minimum_bet: int) -> None:
-        """Initialize the side pot with players and minimum bet."""
-        super().__init__()  # Call parent constructor
-        self.id = SidePot.counter  # Assign side pot ID
-        self.players = players  # Players contributing to the side pot
-        self.total_pot = self.add_pot(players, minimum_bet)  # Add to pot
-        SidePot.counter += 1  # Increment side pot ID counter
-
-    def win(self) -> None:
-        """Determine the winner of the side pot."""
-        leaderboard = sorted(self.players, reverse=True,
-                             key=lambda player: player.final_score)  # Sort players by final score
-        draw = [player for player in leaderboard if player.final_score ==
-                leaderboard[0].final_score]  # Check for ties
-        amount = self.share(len(draw))  # Calculate share for winners
-        for player in draw:
-            print(f"{player.name} wins ${amount} from side pot {
-                  self.id}")  # Announce winner
-            player.win += amount  # Add winnings to player's total
+
+    def __init__(self, players: list[Player], total_pot: int, number: int) -> None:
+        """Initialize the side pot with its eligible players, amount and number."""
+        super().__init__(players, total_pot)  # Call parent constructor
+        self.id = number  # Side pot number within the hand
 
     def __repr__(self) -> str:
         """Return a string representation of the side pot."""
@@ -375,45 +453,41 @@ class SidePot(Pot):
 class MainPot(Pot):
     """Class representing the main pot in the game."""
 
-    def add_pot(self, players: PlayerGroup, round_bet: int) -> None:
-        """Add bets from players to the main pot."""
-        super().add_pot(players, round_bet)  # Call parent method
-        return self.add_side_pot(players)  # Add side pots
+    def add_pot(self, players: PlayerGroup) -> None:
+        """Collect the bets of a betting round into the main pot."""
+        for player in players:
+            self.total_pot += player.bet  # Add player's bet to pot
+            player.contribution += player.bet  # Chips the player put in this hand
+            player.bet = 0  # Reset player's bet
 
     def add_side_pot(self, players: PlayerGroup) -> list[SidePot]:
-        """Create side pots based on player bets."""
-        side = []  # List to hold side pots
-        while True:
-            side_pot_player = []  # List of players for the current side pot
-            for player in players:
-                if player.bet > 0:
-                    # Add player to side pot if they have a bet
-                    side_pot_player.append(player)
-            if len(side_pot_player) > 0:
-                # Find player with minimum bet
-                minimum_bet = min(side_pot_player, key=lambda x: x.bet)
-                # Create a new side pot
-                side.append(SidePot(side_pot_player, minimum_bet))
-                continue
-            else:
-                return side  # Return list of side pots
-
-    def win(self, leaderboard: list[Player]) -> None:
-        """Determine the winner of the main pot."""
-        draw = [player for player in leaderboard if player.final_score ==
-                leaderboard[0].final_score]  # Check for ties
-        amount = self.share(len(draw))  # Calculate share for winners
-        for player in draw:
-            # Announce winner
-            print(f"{player.name} wins ${amount} from main pot")
-            player.win += amount  # Add winnings to player's total
+        """Split the collected chips into the main pot and its side pots, as pot_layers does."""
+        seated = list(players)
+        layers = [([seated[index] for index in eligible], amount) for eligible, amount in pot_layers(
+            [player.contribution for player in seated], [player.fold_status for player in seated])]
+        if not layers:
+            self.players, self.total_pot = players.all_fold(), 0
+            return []
+        self.players, self.total_pot = layers[0]  # Lowest layer is the main pot
+        return [SidePot(eligible, amount, number)
+                for number, (eligible, amount) in enumerate(layers[1:], start=1)]
 
     def __repr__(self) -> str:
         """Return a string representation of the main pot."""
         return f"Main Pot: ${self.total_pot}"
 
 
-def turns(players: PlayerGroup, start_player: int, repeat_turn: int):
+def settle_pots(pots: list[Pot], ranking: ShowdownRanking, sink=no_sink) -> dict[int, int]:
+    """Award every pot against one showdown ranking and return the chips won per player ID."""
+    payouts = {}  # Payout table for the hand
+    for pot in pots:
+        sink("pot", pot=pot)  # Show pot information
+        for player_id, amount in pot.win(ranking, sink).items():
+            payouts[player_id] = payouts.get(player_id, 0) + amount
+    return payouts
+
+
+def turns(players: PlayerGroup, start_player: int, repeat_turn: int, sink=no_sink):
     """Generator to iterate through players' turns."""
     index = start_player  # Start from the specified player
     turn_taken = 0  # Count of turns taken
@@ -426,10 +500,10 @@ def turns(players: PlayerGroup, start_player: int, repeat_turn: int):
             yield (index, player)  # Yield current player's index and object
         elif players[index].fold_status:
             # Notify if player has folded
-            print(f"Player {players[index].id} skipped (Fold)")
+            sink("skip", player=players[index], reason="Fold")
         elif players[index].all_in:
             # Notify if player is all in
-            print(f"Player {players[index].id} skipped (All in)")
+            sink("skip", player=players[index], reason="All in")
 
         index = (index + 1) % len(players)  # Move to the next player
         turn_taken += 1  # Increment turn count
@@ -453,88 +527,69 @@ def blind(players: PlayerGroup, small_blind: int, big_blind: int) -> int:
         return small_blind
 
 
-def act(player: Player, preflop: bool, round_bet: int) -> int:
-    """Handle the player's action during their turn."""
-    if round_bet in (1, 2) and not preflop:  # If it's not preflop
-        while True:
-            # Prompt for action
-            action = input("Action (CHECK / BET / FOLD): ")
-            if action.upper() == "CHECK":
-                player.check()  # Player checks
-                return round_bet
-            elif action.upper() == "BET":
-                start_bet_amount = player.start_bet(
-                    round_bet)  # Player starts betting
-                if start_bet_amount == -1:
-                    continue  # If canceled, continue prompting
-                return start_bet_amount
-            elif action.upper() == "FOLD":
-                player.fold()  # Player folds
-                return round_bet
-            else:
-                print("Invalid Input!")  # Handle invalid input
-    else:
-        while True:
-            # Prompt for action
-            action = input("Action (CALL / RAISE / FOLD): ")
-            if action.upper() == "CALL":
-                player.call_bet(round_bet)  # Player calls the bet
-                return round_bet
-            elif action.upper() == "RAISE":
-                raise_amount = player.raise_bet(
-                    round_bet)  # Player raises the bet
-                if raise_amount == -1:
-                    continue  # If canceled, continue prompting
-                return raise_amount
-            elif action.upper() == "FOLD":
-                player.fold()  # Player folds
-                return round_bet
-            else:
-                print("Invalid Input!")  # Handle invalid input
-
-
-def round_decorator(round_count: int):
-    """Decorator to announce the betting round and deal community cards."""
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            if round_count == 1:
-                print("Second Betting Round: The Flop")
-                print("==============================")
-            elif round_count == 2:
-                print("Third Betting Round: The Turn")
-                print("=============================")
-            elif round_count == 3:
-                print("Final Betting Round: The River")
-                print("==============================")
-            print("Dealing Community Cards...")
-            print()
-            side = func(*args, **kwargs)  # Call the decorated function
-            return side
-        return wrapper
-    return decorator
-
-
-def preflop(players: PlayerGroup, deck_of_cards: set, main: MainPot, start_player: int, round_bet: int) -> list[SidePot]:
-    """Handle the pre flop betting round."""
-    print("First Betting Round: Preflop")
-    print("============================")
+def minimum_raise(round_bet: int) -> int:
+    """Return the lowest total bet a raise may reach."""
+    return 4 if round_bet == 2 else round_bet + 1
 
-    print("Drawing Card...")
-    time.sleep(0.5)  # Simulate delay for drawing cards
-    print()
-    for player in players:
-        player.cards = draw_card(deck_of_cards, 2)  # Each player draws 2 cards
 
+def legal_actions(player: Player, preflop: bool, round_bet: int) -> tuple[str, ...]:
+    """Return the actions the player may choose this turn."""
+    if round_bet in (1, 2) and not preflop:  # Nobody has bet yet after the preflop
+        options = [CHECK]
+        if player.balance > 0:
+            options += [BET, ALL_IN]  # Any bet up to the balance
+    else:
+        options = [CALL]
+        if minimum_raise(round_bet) - player.bet <= player.balance:
+            options += [RAISE, ALL_IN]  # Only if the minimum raise is affordable
+    return tuple(options + [FOLD])
+
+
+def check_decision(player: Player, preflop: bool, round_bet: int, decision: Decision) -> None:
+    """Raise ValueError if the decision breaks the betting rules."""
+    if decision.action not in legal_actions(player, preflop, round_bet):
+        raise ValueError(f"{decision.action} is not allowed now")
+    if decision.action == BET and decision.amount < 1:
+        raise ValueError("Bet is too low")
+    if decision.action == RAISE and decision.amount < minimum_raise(round_bet):
+        raise ValueError("Bet is too low")
+    if decision.action in (BET, RAISE) and decision.amount - player.bet > player.balance:
+        raise ValueError("Your balance is not enough!")
+
+
+def act(player: Player, preflop: bool, round_bet: int, decision: Decision, sink=no_sink) -> int:
+    """Apply the player's decision and return the new round bet."""
+    check_decision(player, preflop, round_bet, decision)
+    action = decision.action
+    if action == CHECK:
+        player.check()  # Player checks
+    elif action == FOLD:
+        player.fold()  # Player folds
+    elif action == CALL:
+        player.call_bet(round_bet)  # Player calls the bet
+        if player.fold_status:
+            action = FOLD  # Players who cannot cover the call fold
+    elif action in (BET, RAISE):
+        player.raise_bet(decision.amount)  # Player bets or raises
+        round_bet = player.bet  # Update round bet
+    elif action == ALL_IN:
+        player.all_in_bet()  # Player bets the whole balance
+        round_bet = player.bet  # Update round bet
+    sink("action", player=player, action=action, amount=player.bet)
+    return round_bet
+
+
+def betting_round(players: PlayerGroup, community_card: set, main: MainPot, start_player: int, round_bet: int, preflop: bool, sink=no_sink):
+    """Generator running one betting round and collecting its bets into the main pot."""
     repeat_turn = 0  # Initialize turn repeat counter
     while True:
         round_over = True  # Flag to check if the round is over
-        for player in turns(players, start_player, repeat_turn):
-            print(f"Total Pot: ${main.total_pot}")  # Display total pot
-            # Display current round bet
-            print(f"Current Round Bet: ${round_bet}")
-            print(player[1])  # Show player's information
-            raise_bet = act(player[1], True, round_bet)  # Get player's action
-            print()
+        for player in turns(players, start_player, repeat_turn, sink):
+            # Ask the player's strategy for a decision
+            decision = yield ActionRequest(
+                player[1], legal_actions(player[1], preflop, round_bet), round_bet,
+                minimum_raise(round_bet), main.total_pot, community_card, preflop)
+            raise_bet = act(player[1], preflop, round_bet, decision, sink)
             if raise_bet != round_bet:  # If the bet has changed
                 round_bet = raise_bet  # Update round bet
                 # Move to the next player
@@ -542,232 +597,332 @@ def preflop(players: PlayerGroup, deck_of_cards: set, main: MainPot, start_playe
                 round_over = False  # Round is not over
                 repeat_turn = 1  # Set repeat turn flag
                 break
-            last_player = players.all_fold()  # Check if all players have folded
-            if len(last_player) == 1:  # If only one player is left
-                return main.add_pot(players, round_bet)  # Add pot and return
+            if players.live_count() == 1:  # If only one player is left
+                return main.add_pot(players)  # Add pot and return
         if round_over:  # If the round is over
-            return main.add_pot(players, round_bet)  # Add pot and return
+            return main.add_pot(players)  # Add pot and return
 
 
-def round(players: PlayerGroup, deck_of_cards: set, community_card: set, main: MainPot, start_player: int, round_bet: int, number_of_cards: int):
-    """Handle a betting round after the preflop."""
-    community_card.update(
-        draw_card(deck_of_cards, number_of_cards))  # Draw community cards
-    turn = 0  # Initialize turn counter
-    while True:
-        round_over = True  # Flag to check if the round is over
-        for player in turns(players, start_player, turn):
-            print("Community Cards")
-            print(show_card(community_card))  # Show community cards
-            print("=" * len(show_card(community_card)))  # Separator
-            print(f"Total Pot: ${main.total_pot}")  # Display total pot
-            # Display current round bet
-            print(f"Current Round Bet: ${round_bet}")
-            print(player[1])  # Show player's information
-            raise_bet = act(player[1], False, round_bet)  # Get player's action
-            print()
-            if raise_bet != round_bet:  # If the bet has changed
-                round_bet = raise_bet  # Update round bet
-                # Move to the next player
-                start_player = (player[0] + 1) % len(players)
-                round_over = False  # Round is not over
-                turn = 1  # Set turn flag
-                break
-            last_player = players.all_fold()  # Check if all players have folded
-            if len(last_player) == 1:  # If only one player is left
-                return main.add_pot(players, round_bet)  # Add pot and return
-        if round_over:  # If the round is over
-            return main.add_pot(players, round_bet)  # Add pot and return
+def round_decorator(round_count: int):
+    """Decorator to announce the betting round before its community cards are shown."""
+    def decorator(func):
+        def wrapper(*args, sink=no_sink, **kwargs):
+            sink("street", round_count=round_count)  # Announce the round
+            return (yield from func(*args, sink=sink, **kwargs))  # Run the decorated round
+        return wrapper
+    return decorator
+
+
+@round_decorator(0)
+def preflop(players: PlayerGroup, deck: Deck, main: MainPot, start_player: int, round_bet: int, sink=no_sink):
+    """Handle the pre flop betting round."""
+    for player in players:
+        player.hand_mask = deck.deal(2)  # Each player draws 2 cards
+    sink("deal", players=players)
+    return (yield from betting_round(players, set(), main, start_player, round_bet, True, sink))
+
+
+def round(players: PlayerGroup, board: int, main: MainPot, start_player: int, round_bet: int, sink=no_sink):
+    """Handle a betting round after the preflop on the given board mask."""
+    players.deal_board(board)  # Add the new cards to every player's strength
+    community_card = mask_to_cards(board)  # Community cards as shown to strategies
+    sink("board", community_card=community_card)
+    return (yield from betting_round(players, community_card, main, start_player, round_bet, False, sink))
 
 
 @round_decorator(1)
-def flop(players: PlayerGroup, deck_of_cards: set, community_card: set, main: MainPot, start_player: int, round_bet: int):
+def flop(players: PlayerGroup, board: int, main: MainPot, start_player: int, round_bet: int, sink=no_sink):
     """Handle the flop betting round."""
-    return round(players, deck_of_cards, community_card, main, start_player, round_bet, 3)  # Draw 3 community cards
+    return (yield from round(players, board, main, start_player, round_bet, sink))
 
 
 @round_decorator(2)
-def turn(players: PlayerGroup, deck_of_cards: set, community_card: set, main: MainPot, start_player: int, round_bet: int):
+def turn(players: PlayerGroup, board: int, main: MainPot, start_player: int, round_bet: int, sink=no_sink):
     """Handle the turn betting round."""
-    return round(players, deck_of_cards, community_card, main, start_player, round_bet, 1)  # Draw 1 community card
+    return (yield from round(players, board, main, start_player, round_bet, sink))
 
 
 @round_decorator(3)
-def river(players: PlayerGroup, deck_of_cards: set, community_card: set, main: MainPot, start_player: int, round_bet: int):
+def river(players: PlayerGroup, board: int, main: MainPot, start_player: int, round_bet: int, sink=no_sink):
     """Handle the river betting round."""
-    return round(players, deck_of_cards, community_card, main, start_player, round_bet, 1)
-# Draw 1 community card
-
-
-def check_set(player_hand: set, array: np.array) -> bool:
-    """Check if the player's hand contains any of the specified sets."""
-    for card in array:
-        card = list(tuple(x) for x in card)  # Convert to list of tuples
-        card = {(int(x), int(y)) for x, y in card}  # Convert to set of tuples
-        # Check if the player's hand contains the card set
-        result = card.issubset(player_hand)
-        if result:
-            return True  # Return True if found
-    return False  # Return False if not found
-
-
-def check_pair(player_hand: set) -> int:
-    """Check for pairs in the player's hand."""
-    pair = []  # List to hold pairs
-    for card in pair:
-        card = list(tuple(x) for x in card)  # Convert to list of tuples
-        card = {(int(x), int(y)) for x, y in card}  # Convert to set of tuples
-        # Check if the player's hand contains the card set
-        result = card.issubset(player_hand)
-        if result:
-            pair.append(list(card))  # Add found pair to the list
-    return pair  # Return the list of pairs
+    return (yield from round(players, board, main, start_player, round_bet, sink))
 
 
 def check_result(player_hand: set, community_card: set) -> int:
     """Evaluate the player's hand against the community cards and return the hand rank."""
-    flush = [x for x in range(1, 5) if [card[1] for card in player_hand].count(
-        x) >= 5]  # Check for flush
-    # Get unique card values from player's hand
-    straight_player = {card[0] for card in player_hand}
-    straight = [card for card in straight_list if set(
-        card).issubset(straight_player)]  # Check for straight
-    if check_set(player_hand, royal_flush):
-        return 10  # Royal Flush
-    elif check_set(player_hand, straight_flush):
-        return 9  # Straight Flush
-    elif check_set(player_hand, four):
-        return 8  # Four of a Kind
-    elif check_set(player_hand, three) and check_set(player_hand, pair):
-        return 7  # Full House
-    elif len(flush) > 0:
-        return 6  # Flush
-    elif len(straight) > 0:
-        return 5  # Straight
-    elif check_set(player_hand, three):
-        return 4  # Three of a Kind
-    elif len(check_pair(player_hand)) == 2 and len(check_pair(community_card)) != 2:
-        return 3  # Two Pair
-    elif len(check_pair(player_hand)) in (1, 3):
-        return 2  # One Pair
-    else:
-        return 1  # High Card
+    return hand_category(evaluate(player_hand))  # Category of the strength ordinal
 
 
-def showdown(players: PlayerGroup, community_card: set, main: MainPot, side: list[SidePot]):
-    """Conduct the showdown to determine the winner."""
-    print("S H O W D O W N")
-    print("===============")
-    if community_card:
-        print("Community Card")
-        print(show_card(community_card))  # Show community cards
-        print()
+def showdown(players: PlayerGroup, board: int, main: MainPot, button: int, sink=no_sink) -> dict[int, int]:
+    """Conduct the showdown on the given board mask and return the payout table."""
     for player in players:
         if not player.fold_status:  # If player has not folded
             # Combine player's cards with community cards
-            player.final_cards = player.cards | community_card
-            player.score = check_result(
-                player.final_cards, community_card)  # Evaluate player's hand
-            print(f"{player.name} Final Card")
-            print(show_card(player.final_cards))  # Show final cards
-            # Show player's cards
-            print(f"{player.name} Cards: {show_card(player.cards)}")
-            print(f"Card Rank: {SCORE_RANK[player.score]}")  # Show hand rank
-            time.sleep(1)  # Pause for effect
-            print()
-
-    players.final_score()  # Calculate final scores
+            player.final_mask = player.hand_mask | board
 
-    # Sort players by final score
-    leaderboard = sorted(players, reverse=True,
-                         key=lambda player: player.final_score)
+    players.deal_board(board)  # Already current unless the board skipped the betting rounds
+    players.final_score()  # Evaluate every player's hand
+    sink("showdown", players=players, community_card=mask_to_cards(board))
 
-    print(main)  # Show main pot
-    main.win(leaderboard)  # Determine winner of the main pot
+    # Rank live players by final score, ties in seat order starting left of the button
+    seats = players[button + 1:] + players[:button + 1]
+    ranking = ShowdownRanking(seats)
 
-    if len(side) > 0:  # If there are side pots
-        for sides in side:
-            print(sides)  # Show side pot information
-            sides.win()  # Determine winner of the side pot
+    side = main.add_side_pot(players)  # Build the main pot and side pots
+    payouts = settle_pots([main] + side, ranking, sink)  # Determine the winners
 
-    print()
-    print("CARD RANK LEADERBOARD")
-    print("================")
-    rank = 1
+    # Ranked players first, then folded players in seat order
+    leaderboard = ranking.leaderboard() + [player for player in seats if player.fold_status]
     for player in leaderboard:
-        if player.fold_status:
-            print(f"{rank}. {player.name} (Fold)")  # Show folded players
-        else:
-            # Show active players and their winnings
-            print(f"{rank}. {player.name} ({
-                  SCORE_RANK[player.score]}) +${player.win}")
         player.balance += player.win  # Update player's balance with winnings
-        rank += 1  # Increment rank for next player
+    sink("leaderboard", leaderboard=leaderboard)
+    return payouts
+
+
+def hand(players: PlayerGroup, button: int, deck: Deck, sink=no_sink):
+    """Generator playing one hand, yielding an ActionRequest for every decision."""
+    players.reset_game()  # Clear the previous hand
+    players.button = button  # Let strategies work out the positions
+    players.hands_dealt += 1
+    deck.reset()  # Return every card to the deck
+    board = 0  # Card mask of the community cards
+
+    main = MainPot()  # Create the main pot
+    round_bet = 1  # Set initial round bet
+
+    # Determine small blind position
+    small_blind = (button + 1) % len(players)
+    if len(players) > 2:
+        # Determine big blind position
+        big_blind = (small_blind + 1) % len(players)
+        round_bet = 2  # Set round bet to 2 if there is a big blind
+    else:
+        big_blind = -1  # No big blind if only two players
+    sink("position", button=players[button], small_blind=players[small_blind],
+         big_blind=players[big_blind] if big_blind >= 0 else None)
 
-    time.sleep(1)  # Pause for effect
-    print()  # Print a new line
+    # Set blinds and determine starting player
+    start_player = blind(players, small_blind, big_blind)
 
+    yield from preflop(players, deck, main,
+                       start_player, round_bet, sink=sink)  # Handle preflop betting
 
-def game(players: PlayerGroup) -> None:
-    """Main game loop to handle the flow of the poker game."""
-    button = 0  # Initialize button position
-    while True:
-        # Create a deck of cards
-        deck_of_cards = {(val, suit) for suit in SUIT_RANK for val in VAL_RANK}
-        community_card = set()  # Initialize community cards
-
-        main = MainPot()  # Create the main pot
-        side = []  # Initialize side pots
-        round_bet = 1  # Set initial round bet
-
-        # Determine small blind position
-        small_blind = (button + 1) % len(players)
-        if len(players) > 2:
-            # Determine big blind position
-            big_blind = (small_blind + 1) % len(players)
+    start_player = small_blind  # Reset starting player to small blind
+
+    for street, number_of_cards in ((flop, 3), (turn, 1), (river, 1)):
+        if players.live_count() > 1 and not players.all_in():  # If more than one player is active
+            board |= deck.deal(number_of_cards)  # Deal community cards
+            yield from street(players, board, main,
+                              start_player, round_bet, sink=sink)  # Handle street betting
+
+    return showdown(players, board, main, button, sink)  # Conduct the showdown
+
+
+def play_hand(players: PlayerGroup, button: int, strategies: dict, sink=no_sink, deck: Deck | None = None) -> dict[int, int]:
+    """Play one complete hand and return its payout table of chips won per player ID.
+
+    Each decision is asked of the strategy of the player's ID. Pass a seeded
+    Deck, reset with a seed before each hand, to replay deals.
+    """
+    steps = hand(players, button, Deck() if deck is None else deck, sink)
+    try:
+        request = next(steps)  # First decision of the hand
+        while True:
+            request = steps.send(strategies[request.player.id].decide(request))
+    except StopIteration as result:
+        return result.value  # The hand is over
+
+
+class PassiveStrategy:
+    """Strategy that checks whenever it can and calls otherwise."""
+
+    def decide(self, request: ActionRequest) -> Decision:
+        """Check or call the current bet."""
+        return Decision(CHECK if CHECK in request.options else CALL)
+
+
+class RandomStrategy:
+    """Strategy that picks a uniformly random legal action."""
+
+    def __init__(self, rng: random.Random | None = None) -> None:
+        """Initialize the strategy with its own random number generator."""
+        self.rng = rng or random.Random()
+
+    def decide(self, request: ActionRequest) -> Decision:
+        """Pick a random action, betting a random affordable amount."""
+        action = self.rng.choice(request.options)
+        player = request.player
+        if action in (BET, RAISE):
+            lowest = 1 if action == BET else request.minimum_raise
+            return Decision(action, self.rng.randint(lowest, player.bet + player.balance))
+        return Decision(action)
+
+
+class ConsoleStrategy:
+    """Strategy that asks the player at the terminal for every decision."""
+
+    def decide(self, request: ActionRequest) -> Decision:
+        """Show the table and prompt until the player enters a valid action."""
+        player = request.player
+        if not request.preflop:
+            print("Community Cards")
+            print(show_card(request.community_card))  # Show community cards
+            print("=" * len(show_card(request.community_card)))  # Separator
+        print(f"Total Pot: ${request.total_pot}")  # Display total pot
+        # Display current round bet
+        print(f"Current Round Bet: ${request.round_bet}")
+        print(player)  # Show player's information
+        if not request.preflop:
+            print(f"Hand: {SCORE_RANK[hand_category(player.strength)]}")  # Current hand rank
+        if CHECK in request.options:  # Nobody has bet yet
+            while True:
+                # Prompt for action
+                action = input("Action (CHECK / BET / FOLD): ").upper()
+                if action in (CHECK, FOLD):
+                    return Decision(action)
+                elif action == BET:
+                    decision = self.prompt_bet(request, BET, "Please enter bet amount!")
+                    if decision:
+                        return decision
+                else:
+                    print("Invalid Input!")  # Handle invalid input
         else:
-            big_blind = -1  # No big blind if only two players
+            while True:
+                # Prompt for action
+                action = input("Action (CALL / RAISE / FOLD): ").upper()
+                if action in (CALL, FOLD):
+                    return Decision(action)
+                elif action == RAISE:
+                    decision = self.prompt_bet(request, RAISE, f"Please enter the amount to raise (Minimum to ${request.minimum_raise})!")
+                    if decision:
+                        return decision
+                else:
+                    print("Invalid Input!")  # Handle invalid input
 
+    def prompt_bet(self, request: ActionRequest, action: str, message: str) -> Decision | None:
+        """Prompt for a bet amount, returning None if the player cancels."""
+        while True:
+            print(message)
+            new_bet = input("Action (BET ($) / ALL IN / EXIT) : ").upper()
+            if new_bet == "EXIT":
+                print(f"{request.player.name} cancels the {action.lower()}")
+                return None  # Back to the action prompt
+            if new_bet == ALL_IN:
+                decision = Decision(ALL_IN)  # Bet all remaining balance
+            elif new_bet.isdigit():
+                decision = Decision(action, int(new_bet))  # Convert input to integer
+            else:
+                print("Invalid bet!")  # Handle invalid input
+                continue
+            try:
+                check_decision(request.player, request.preflop, request.round_bet, decision)
+                return decision
+            except ValueError as error:
+                print(error)  # Bet too low or balance not enough
+
+
+def console_sink(event: str, **fields) -> None:
+    """Print a game event for the players at the terminal."""
+    if event == "position":
         print("POSITION")
-        print(f"Button: {players[button].name}")  # Display button player
+        print(f"Button: {fields['button'].name}")  # Display button player
         # Display small blind player
-        print(f"Small Blind: {players[small_blind].name}")
-        if len(players) > 2:
-            round_bet = 2  # Set round bet to 2 if there is a big blind
+        print(f"Small Blind: {fields['small_blind'].name}")
+        if fields["big_blind"] is not None:
             # Display big blind player
-            print(f"Big Blind: {players[big_blind].name}")
-
+            print(f"Big Blind: {fields['big_blind'].name}")
         time.sleep(1)  # Pause for effect
-
         print()
         print("Starting Game...")
         print()
-
         time.sleep(0.5)  # Simulate delay for starting the game
+    elif event == "street":
+        if fields["round_count"] == 0:
+            print("First Betting Round: Preflop")
+            print("============================")
+            print("Drawing Card...")
+            time.sleep(0.5)  # Simulate delay for drawing cards
+        else:
+            if fields["round_count"] == 1:
+                print("Second Betting Round: The Flop")
+                print("==============================")
+            elif fields["round_count"] == 2:
+                print("Third Betting Round: The Turn")
+                print("=============================")
+            elif fields["round_count"] == 3:
+                print("Final Betting Round: The River")
+                print("==============================")
+            print("Dealing Community Cards...")
+        print()
+    elif event == "skip":
+        print(f"Player {fields['player'].id} skipped ({fields['reason']})")
+    elif event == "action":
+        player, action, amount = fields["player"], fields["action"], fields["amount"]
+        if action == CHECK:
+            print(f"{player.name} checks")
+        elif action == FOLD:
+            print(f"{player.name} folds")
+        elif player.all_in:
+            print(f"{player.name} ALL IN (${amount})!")
+        elif action == CALL:
+            print(f"{player.name} calls the bet (${amount})")
+        else:
+            print(f"{player.name} raises the bet to ${amount}")
+        print()
+    elif event == "showdown":
+        print("S H O W D O W N")
+        print("===============")
+        if fields["community_card"]:
+            print("Community Card")
+            print(show_card(fields["community_card"]))  # Show community cards
+            print()
+        for player in fields["players"]:
+            if not player.fold_status:  # If player has not folded
+                print(f"{player.name} Final Card")
+                print(show_card(player.final_cards))  # Show final cards
+                # Show player's cards
+                print(f"{player.name} Cards: {show_card(player.cards)}")
+                print(f"Card Rank: {SCORE_RANK[player.score]}")  # Show hand rank
+                time.sleep(1)  # Pause for effect
+                print()
+    elif event == "pot":
+        print(fields["pot"])  # Show pot information
+    elif event == "pot_win":
+        pot = fields["pot"]
+        source = f"side pot {pot.id}" if isinstance(pot, SidePot) else "main pot"
+        print(f"{fields['player'].name} wins ${fields['amount']} from {source}")
+    elif event == "leaderboard":
+        print()
+        print("CARD RANK LEADERBOARD")
+        print("================")
+        rank = 1
+        for player in fields["leaderboard"]:
+            if player.fold_status:
+                print(f"{rank}. {player.name} (Fold)")  # Show folded players
+            else:
+                # Show active players and their winnings
+                print(f"{rank}. {player.name} ({
+                      SCORE_RANK[player.score]}) +${player.win}")
+            rank += 1  # Increment rank for next player
+        time.sleep(1)  # Pause for effect
+        print()  # Print a new line
+    elif event == "lose":
+        player = fields["player"]
+        print(f"{player.name} lost! (Balance: ${player.balance})")
 
-        # Set blinds and determine starting player
-        start_player = blind(players, small_blind, big_blind)
-
-        side += preflop(players, deck_of_cards, main,
-                        start_player, round_bet)  # Handle preflop betting
-
-        start_player = small_blind  # Reset starting player to small blind
-
-        if len(players.all_fold()) > 1 and not players.all_in():  # If more than one player is active
-            side += flop(players, deck_of_cards, community_card,
-                         main, start_player, round_bet)  # Handle flop betting
-
-        if len(players.all_fold()) > 1 and not players.all_in():  # If more than one player is active
-            side += turn(players, deck_of_cards, community_card,
-                         main, start_player, round_bet)  # Handle turn betting
 
-        if len(players.all_fold()) > 1 and not players.all_in():  # If more than one player is active
-            side += river(players, deck_of_cards, community_card,
-                          main, start_player, round_bet)  # Handle river betting
+def game(players: PlayerGroup, sink=console_sink, strategies: dict | None = None) -> None:
+    """Main game loop to handle the flow of the poker game, showing events to sink.
 
-        showdown(players, community_card, main, side)  # Conduct the showdown
+    Seats without a strategy in strategies are played at the terminal.
+    """
+    button = 0  # Initialize button position
+    strategies = {player.id: ConsoleStrategy() for player in players} | (strategies or {})
+    deck = Deck()  # Shuffled again as it deals each hand
+    while True:
+        play_hand(players, button, strategies, sink, deck)  # Play one hand
 
-        players.update_status()  # Update player statuses
+        players.update_status(sink)  # Update player statuses
 
         # Display Leaderboard
         print(players)  # Show player standings
@@ -790,7 +945,6 @@ def game(players: PlayerGroup) -> None:
         if play_again.upper() == "Y":
             # Move button to the next player
             button = (button + 1) % len(players)
-            players.reset_game()  # Reset game state for players
             continue  # Start a new game
         else:
             leaderboard = sorted(players)  # Sort players for final leaderboard
@@ -802,6 +956,12 @@ def game(players: PlayerGroup) -> None:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Texas Hold'em at the terminal.")
+    parser.add_argument("--history", help="append every hand to this hand history file")
+    parser.add_argument("--bots", type=int, default=0, help="seats played by the computer, after the people")
+    parser.add_argument("--think-ms", type=float, default=50.0, help="time each computer decision may take")
+    arguments = parser.parse_args()
+
     print("Welcome to Texas Hold'em Poker Game")
     print("===================================")
 
@@ -838,15 +998,31 @@ if __name__ == "__main__":
 
     print()
 
+    # Set player names, computer players taking the last seats
+    bots = min(max(arguments.bots, 0), number_of_player)
+    names = [input(f"Player {Player.counter + index}'s name: ")
+             for index in range(number_of_player - bots)]
+    names += [f"Bot {index + 1}" for index in range(bots)]
+
     # Create player group
-    players = PlayerGroup(number_of_player, initial_balance)
+    players = PlayerGroup(number_of_player, initial_balance, names)
+    strategies = {}
+    if bots:
+        from ismcts import ISMCTSStrategy
+        strategies = {player.id: ISMCTSStrategy(arguments.think_ms / 1000)
+                      for player in players[number_of_player - bots:]}
 
     print()
     print("Loading Game...")
     print()
     time.sleep(0.5)  # Simulate loading delay
 
-    game(players)  # Start the game
+    if arguments.history:
+        from history import HandRecorder
+        with HandRecorder(arguments.history, console_sink) as recorder:
+            game(players, recorder, strategies)  # Start the game, recording every hand
+    else:
+        game(players, strategies=strategies)  # Start the game
 
     print()
     print("Thank you for playing")  # End of game message
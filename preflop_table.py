@@ -0,0 +1,105 @@
+"""Preflop equity of the 169 starting hands against 1 to 9 random opponents."""
+import argparse
+import os
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from cards import card_index
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.npy")
+MAX_OPPONENTS = 9
+LABELS = "AKQJT98765432"  # Value letters from Ace down to 2
+
+_table = None  # Memory-mapped table, loaded on first lookup
+
+
+def hand_index(high: int, low: int, suited: bool) -> int:
+    """Return the 0-168 grid index of a starting hand.
+
+    Row and column count down from the Ace: pairs sit on the diagonal,
+    suited hands above it and offsuit hands below it.
+    """
+    row, column = 14 - max(high, low), 14 - min(high, low)
+    if suited:
+        return row * 13 + column
+    return column * 13 + row
+
+
+def starting_hand_index(cards) -> int:
+    """Return the grid index of two (value, suit) hole cards."""
+    (value_1, suit_1), (value_2, suit_2) = cards
+    return hand_index(value_1, value_2, suit_1 == suit_2 and value_1 != value_2)
+
+
+def hand_label(index: int) -> str:
+    """Return the label of a grid index, such as AA, AKs or 72o."""
+    row, column = divmod(index, 13)
+    if row == column:
+        return LABELS[row] * 2
+    if row < column:
+        return LABELS[row] + LABELS[column] + "s"
+    return LABELS[column] + LABELS[row] + "o"
+
+
+def representative(index: int) -> list[tuple]:
+    """Return one pair of (value, suit) cards for a grid index."""
+    row, column = divmod(index, 13)
+    high, low = 14 - min(row, column), 14 - max(row, column)
+    return [(high, 1), (low, 1 if row < column else 2)]  # Same suit only if suited
+
+
+def simulate(cards: list[tuple], trials: int, rng: np.random.Generator) -> np.ndarray:
+    """Return the equity of the hole cards against 1 to 9 opponents.
+
+    Every trial deals a board and nine opponent hands; the first k of
+    them give the result against k opponents, so one sample serves all.
+    """
+    hole = np.array([card_index(card) for card in cards])
+    remaining = np.setdiff1d(np.arange(52), hole)  # The 50 unseen cards
+    dealt = remaining[np.argsort(rng.random((trials, len(remaining))), axis=1)[:, :5 + 2 * MAX_OPPONENTS]]
+    board = dealt[:, :5]
+
+    hero = evaluate_batch(np.hstack([board, np.broadcast_to(hole, (trials, 2))]))
+    opponents = np.column_stack([
+        evaluate_batch(np.hstack([board, dealt[:, 5 + 2 * seat:7 + 2 * seat]]))
+        for seat in range(MAX_OPPONENTS)])
+
+    best = np.maximum.accumulate(opponents, axis=1)  # Best of the first k opponents
+    ties = np.cumsum(opponents == hero[:, None], axis=1)  # Opponents matching the hero
+    share = np.where(hero[:, None] > best, 1.0,
+                     np.where(hero[:, None] == best, 1 / (ties + 1), 0.0))
+    return share.mean(axis=0)
+
+
+def build_table(trials: int = 50_000, seed: int = 0) -> np.ndarray:
+    """Simulate the (169, 9) equity table; the same seed gives the same table."""
+    rng = np.random.default_rng(seed)
+    return np.array([simulate(representative(index), trials, rng)
+                     for index in range(169)], dtype=np.float32)
+
+
+def load_table() -> np.ndarray:
+    """Return the equity table, memory mapped from TABLE_PATH."""
+    global _table
+    if _table is None:
+        _table = np.load(TABLE_PATH, mmap_mode="r")
+    return _table
+
+
+def preflop_equity(cards, opponents: int) -> float:
+    """Return the equity of two (value, suit) hole cards against random opponents."""
+    if not 1 <= opponents <= MAX_OPPONENTS:
+        raise ValueError(f"Number of opponents must be between 1 and {MAX_OPPONENTS}")
+    return float(load_table()[starting_hand_index(cards), opponents - 1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the preflop equity table.")
+    parser.add_argument("--trials", type=int, default=50_000, help="runouts per starting hand")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the simulation")
+    parser.add_argument("--output", default=TABLE_PATH, help="path of the .npy file")
+    arguments = parser.parse_args()
+
+    np.save(arguments.output, build_table(arguments.trials, arguments.seed))
+    print(f"Preflop equity table written to {arguments.output}")
@@ -0,0 +1,373 @@
+"""Push/fold equilibrium charts for short stacks, solved by regret matching+.
+
+Every player either folds or moves all in preflop. The first player to
+move all in may be called by one later player, after which everyone left
+folds, so each pot is a heads-up all-in. That makes the opening position
+of the push its own subgame: the pusher's range against the call range of
+every player behind, which regret matching+ solves with matrix-vector
+products over the 169 starting hands.
+
+Blinds follow the engine: at 3 or more players the small and big blind
+post 1 and 2 and the player left of the big blind acts first. Heads up
+only the small blind posts, and the button acts first.
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from poker import ALL_IN, CALL, CHECK, FOLD, ActionRequest, Decision
+from preflop_table import hand_label, starting_hand_index
+from ranges import ALL_COMBOS, hand_combos
+
+EQUITY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "allin_equity.npy")
+CHARTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pushfold_charts.npz")
+CHART_STACKS = range(6, 43, 4)  # Stacks in chips stored in the charts file
+CHECK_INTERVAL = 100  # Solver rounds between exploitability checks
+
+_equity = None  # Memory-mapped hand-versus-hand equity, loaded on first use
+_weights = None  # Combo pairs of every two starting hands
+_charts = None  # Charts by (players, stack), from the file and solved since
+
+
+class Chart(NamedTuple):
+    """Equilibrium push and call frequencies of one table size and stack depth.
+
+    Positions count in preflop action order, so the big blind is the last.
+    The solver's averages only approach the equilibrium, so exploitability
+    records how far this chart is from it.
+    """
+    players: int
+    stack: int  # Chips every player holds before the blinds
+    blinds: tuple[int, ...]  # Chips posted by each position
+    push: np.ndarray  # (players, 169) frequency of moving all in when folded to
+    call: np.ndarray  # (players, players, 169) frequency of calling a push from a position
+    exploitability: float  # Chips per hand best responses would still gain, summed over the subgames
+
+
+def class_combos(index: int) -> list[tuple[int, int]]:
+    """Return the combos of a 0-168 starting hand grid index."""
+    row, column = divmod(index, 13)
+    high, low = 14 - min(row, column), 14 - max(row, column)
+    return hand_combos(high, low, "" if row == column else "s" if row < column else "o")
+
+
+def combo_weights() -> np.ndarray:
+    """Return the (169, 169) number of combo pairs two starting hands can be dealt as."""
+    global _weights
+    if _weights is None:
+        classes = np.zeros((len(ALL_COMBOS), 169))  # Starting hand of every combo
+        cards = np.zeros((len(ALL_COMBOS), 52))  # Cards of every combo
+        row = 0
+        for index in range(169):
+            for first, second in class_combos(index):
+                classes[row, index] = 1
+                cards[row, [first, second]] = 1
+                row += 1
+        apart = (cards @ cards.T) == 0  # Combos sharing no card
+        _weights = classes.T @ apart @ classes
+    return _weights
+
+
+def canonical_boards() -> tuple[np.ndarray, np.ndarray]:
+    """Return one board of every suit renaming class and how many boards each stands for.
+
+    Boards that differ only by a renaming of the suits score every pair of
+    hands the same once the hands are renamed too, so only the board with
+    the smallest card mask of each class is kept.
+    """
+    boards = np.array(list(itertools.combinations(range(52), 5)), dtype=np.int64)
+    values, suits = boards & ~3, boards & 3
+    masks = np.bitwise_or.reduce(np.left_shift(1, boards), axis=1)
+    smallest = masks.copy()
+    fixed = np.zeros(len(boards), dtype=np.int64)  # Renamings that leave each board as it is
+    for renaming in itertools.permutations(range(4)):
+        image = np.bitwise_or.reduce(np.left_shift(1, values | np.array(renaming)[suits]), axis=1)
+        np.minimum(smallest, image, out=smallest)
+        fixed += image == masks
+    kept = masks == smallest
+    return boards[kept], 24 // fixed[kept]
+
+
+def build_equity(chunk: int = 256) -> np.ndarray:
+    """Return the exact (169, 169) all-in equity of each starting hand against each other.
+
+    Every board is scored for all 1326 combos at once, dealing one board of
+    each suit renaming class weighted by the boards it stands for. Summing
+    the totals over the 24 renamings then counts each of the C(52, 5)
+    boards exactly 24 times for every pair of combos.
+    """
+    combos = np.array([combo for index in range(169) for combo in class_combos(index)])
+    count = len(combos)
+    totals = np.zeros((count, count), dtype=np.int64)  # Weighted boards won minus boards lost
+    boards, weights = canonical_boards()
+    for start in range(0, len(boards), chunk):
+        block = boards[start:start + chunk]
+        live = ~(combos[None, :, :, None] == block[:, None, None, :]).any(axis=(2, 3))  # Combos off the board
+        cards = np.hstack([np.repeat(block, count, axis=0), np.tile(combos, (len(block), 1))])
+        strengths = np.zeros((len(block), count), dtype=np.int64)
+        strengths[live] = evaluate_batch(cards[live.ravel()])
+        for board_strengths, alive, weight in zip(strengths, live, weights[start:start + chunk]):
+            ranks = np.unique(board_strengths, return_inverse=True)[1].astype(np.int16)
+            outcome = np.sign(ranks[:, None] - ranks[None, :])
+            outcome[~alive] = 0
+            outcome[:, ~alive] = 0
+            totals += weight * outcome
+
+    row = {tuple(combo): index for index, combo in enumerate(combos.tolist())}
+    renamed_totals = np.zeros_like(totals)
+    for renaming in itertools.permutations(range(4)):
+        renamed = [row[tuple(sorted(card & ~3 | renaming[card & 3] for card in combo))]
+                   for combo in combos.tolist()]
+        renamed_totals += totals[np.ix_(renamed, renamed)]
+
+    classes = np.zeros((count, 169))  # Starting hand of every combo
+    classes[np.arange(count), [index for index in range(169) for _ in class_combos(index)]] = 1
+    apart = ~(combos[:, None, :, None] == combos[None, :, None, :]).any(axis=(2, 3))  # Combos sharing no card
+    margin = classes.T @ (renamed_totals * apart) @ classes
+    runouts = combo_weights() * math.comb(48, 5) * 24  # Boards dealt with every combo pair, 24 times
+    return (0.5 + 0.5 * margin / runouts).astype(np.float32)
+
+
+def load_equity() -> np.ndarray:
+    """Return the all-in equity matrix, memory mapped from EQUITY_PATH."""
+    global _equity
+    if _equity is None:
+        _equity = np.load(EQUITY_PATH, mmap_mode="r")
+    return _equity
+
+
+def table_blinds(players: int) -> tuple[int, ...]:
+    """Return the chips each position posts, in preflop action order."""
+    if players == 2:
+        return (0, 1)  # The button acts first, then the small blind
+    return (0,) * (players - 2) + (1, 2)
+
+
+def solve_subgame(pusher: int, blinds: tuple, stack: int, iterations: int, tolerance: float) -> tuple:
+    """Solve the pushes of one position against every call range behind it.
+
+    Regret matching+: each round every player plays each hand in proportion
+    to the chips pushing or calling would have gained over its play so far,
+    regrets floored at zero, and the averages of the rounds weighted by
+    their number converge to an equilibrium. Stops once a best response
+    gains less than tolerance chips per hand against the averages, checked
+    every CHECK_INTERVAL rounds, or after iterations rounds. Returns the
+    push frequencies, the (callers, 169) call frequencies and that gain.
+    """
+    weights = combo_weights()
+    wins = weights * load_equity()  # Combo pairs weighted by the pusher's equity
+    losses = weights - wins  # The same pairs weighted by the caller's equity
+    totals = weights.sum(axis=1)
+    combos = np.array([len(class_combos(index)) for index in range(169)], dtype=float)
+    pairs = weights.sum()  # Deals of two hands sharing no card
+
+    callers = range(pusher + 1, len(blinds))
+    dead = sum(blinds) - blinds[pusher]  # Blinds the pusher takes if everyone folds
+    pots = np.array([2 * stack + dead - blinds[caller] for caller in callers], dtype=float)
+    fold = -blinds[pusher]  # Pusher fold value
+    folds = -np.array([blinds[caller] for caller in callers], dtype=float)[:, None]  # Caller fold values
+
+    def values(push: np.ndarray, call: np.ndarray) -> tuple:
+        """Return the push value of every hand, the call values and the pushed combo pairs."""
+        # Pusher: reach the callers in turn, each folding or calling
+        called = (wins @ call.T * pots - weights @ call.T * stack) / totals[:, None]
+        passed = (weights @ (1 - call).T) / totals[:, None]  # Chance each caller folds
+        reach = np.cumprod(np.hstack([np.ones((169, 1)), passed]), axis=1)
+        push_value = (reach[:, :-1] * called).sum(axis=1) + reach[:, -1] * dead
+
+        # Callers: what calling the pushed range is worth
+        pushed = push @ weights  # Combo pairs with the pusher's range, by caller hand
+        with np.errstate(divide="ignore", invalid="ignore"):
+            call_value = np.where(pushed > 0, ((push @ losses) * pots[:, None] - pushed * stack) / pushed, 0.0)
+        return push_value, call_value, pushed
+
+    def exploitability(push: np.ndarray, call: np.ndarray) -> float:
+        """Return the chips per hand a best response gains against the strategies."""
+        push_value, call_value, pushed = values(push, call)
+        gap = (combos @ (np.maximum(push_value, fold) - (push * push_value + (1 - push) * fold))
+               / len(ALL_COMBOS))
+        return gap + (pushed * (np.maximum(call_value, folds) - (call * call_value + (1 - call) * folds))).sum() / pairs
+
+    push_regret, push_fold_regret = np.zeros(169), np.zeros(169)
+    call_regret, call_fold_regret = np.zeros((len(callers), 169)), np.zeros((len(callers), 169))
+    push, call = np.full(169, 0.5), np.full((len(callers), 169), 0.5)  # Strategies of this round
+    push_sum, call_sum = np.zeros(169), np.zeros((len(callers), 169))  # Weighted sums of the rounds
+    gap = np.inf
+    for iteration in range(1, iterations + 1):
+        push_value, call_value, _ = values(push, call)
+        played = push * push_value + (1 - push) * fold
+        np.maximum(push_regret + push_value - played, 0, out=push_regret)
+        np.maximum(push_fold_regret + fold - played, 0, out=push_fold_regret)
+        played = call * call_value + (1 - call) * folds
+        np.maximum(call_regret + call_value - played, 0, out=call_regret)
+        np.maximum(call_fold_regret + folds - played, 0, out=call_fold_regret)
+
+        # Play each action in proportion to its regret, both alike when neither has any
+        total = push_regret + push_fold_regret
+        push = np.divide(push_regret, total, out=np.full(169, 0.5), where=total > 0)
+        total = call_regret + call_fold_regret
+        call = np.divide(call_regret, total, out=np.full(total.shape, 0.5), where=total > 0)
+        push_sum += iteration * push
+        call_sum += iteration * call
+        if iteration % CHECK_INTERVAL == 0 or iteration == iterations:
+            rounds = iteration * (iteration + 1) / 2  # Sum of the round weights
+            gap = exploitability(push_sum / rounds, call_sum / rounds)
+            if gap < tolerance:
+                break
+    return push_sum / rounds, call_sum / rounds, gap
+
+
+def solve(players: int, stack: int, iterations: int = 100_000, tolerance: float = 1e-4) -> Chart:
+    """Return the push/fold equilibrium of a table where everyone holds stack chips.
+
+    Each position's subgame gets an equal share of tolerance chips per
+    hand unless it runs out of iterations first; the chart's
+    exploitability is the sum the subgames reached, so it says how close
+    the chart came.
+    """
+    if not 2 <= players <= 10:
+        raise ValueError("A table seats 2 to 10 players")
+    blinds = table_blinds(players)
+    if stack <= max(blinds):
+        raise ValueError("Every stack must cover its blind with chips to spare")
+    push = np.zeros((players, 169))
+    call = np.zeros((players, players, 169))
+    exploitability = 0.0
+    for pusher in range(players - 1):  # The big blind is never folded to with a choice
+        push[pusher], call[pusher, pusher + 1:], gap = solve_subgame(
+            pusher, blinds, stack, iterations, tolerance / (players - 1))
+        exploitability += gap
+    return Chart(players, stack, blinds, push, call, exploitability)
+
+
+def save_charts(charts: list[Chart], path: str = CHARTS_PATH) -> None:
+    """Write charts to a compressed file, frequencies rounded to whole percent.
+
+    Each chart keeps the exploitability its solve reached, before rounding.
+    """
+    arrays = {}
+    for chart in charts:
+        name = f"{chart.players}-{chart.stack}"
+        arrays[f"{name}-push"] = np.rint(chart.push * 100).astype(np.uint8)
+        arrays[f"{name}-call"] = np.rint(chart.call * 100).astype(np.uint8)
+        arrays[f"{name}-exploitability"] = np.float32(chart.exploitability)
+    np.savez_compressed(path, **arrays)
+
+
+def load_charts(path: str = CHARTS_PATH) -> dict[tuple[int, int], Chart]:
+    """Return the charts stored in a file by (players, stack), or none if it is missing."""
+    if not os.path.exists(path):
+        return {}
+    charts = {}
+    with np.load(path) as arrays:
+        for name in arrays.files:
+            if not name.endswith("-push"):
+                continue
+            players, stack = map(int, name[:-len("-push")].split("-"))
+            prefix = f"{players}-{stack}"
+            charts[players, stack] = Chart(
+                players, stack, table_blinds(players), arrays[f"{prefix}-push"] / 100,
+                arrays[f"{prefix}-call"] / 100, float(arrays[f"{prefix}-exploitability"]))
+    return charts
+
+
+def chart(players: int, stack: int) -> Chart:
+    """Return the chart of a table size at the nearest stored stack, solving it if none is stored."""
+    global _charts
+    if _charts is None:
+        _charts = load_charts()
+    stored = [depth for count, depth in _charts if count == players]
+    if stored:
+        stack = min(stored, key=lambda depth: (abs(depth - stack), depth))
+    if (players, stack) not in _charts:
+        _charts[players, stack] = solve(players, stack)
+    return _charts[players, stack]
+
+
+def chart_grid(frequencies: np.ndarray) -> str:
+    """Return a 13x13 grid of frequencies in percent, suited hands above the diagonal."""
+    lines = ["     " + "".join(f"{label:>4}" for label in "AKQJT98765432")]
+    for row in range(13):
+        cells = "".join(f"{round(frequencies[row * 13 + column] * 100):>4}" for column in range(13))
+        lines.append(f"{hand_label(row * 13 + row)[0]:>5}{cells}")
+    return "\n".join(lines)
+
+
+class PushFoldStrategy:
+    """Strategy that moves all in or folds preflop by the equilibrium charts.
+
+    Positions are counted from the button the PlayerGroup records. Any
+    chips put in beyond a player's blind count as a push to answer by the
+    call chart, and facing more than one such player folds, as the charts do.
+    """
+
+    def __init__(self, rng: random.Random | None = None) -> None:
+        """Initialize the strategy with its own random number generator for mixed frequencies."""
+        self.rng = rng or random.Random()
+
+    def decide(self, request: ActionRequest) -> Decision:
+        """Push, call or fold preflop; check when possible and fold otherwise after it."""
+        player = request.player
+        if not request.preflop or player.group is None:
+            return Decision(CHECK if CHECK in request.options else FOLD)
+        players = list(player.group)
+        count = len(players)
+        blinds = table_blinds(count)
+        first = (player.group.button + (3 if count > 2 else 0)) % count  # Left of the big blind acts first
+        position = {(first + offset) % count: offset for offset in range(count)}  # Seat to position
+        stack = max(other.bet + other.balance for other in players
+                    if other is not player and not other.fold_status)
+        table = chart(count, min(player.bet + player.balance, stack))  # Effective stack
+
+        pushers = [seat for seat, other in enumerate(players)
+                   if other is not player and other.bet > blinds[position[seat]]]
+        mine = position[players.index(player)]
+        if not pushers:
+            if mine == count - 1:
+                return Decision(CALL)  # The big blind checks when everyone folds
+            if self.rng.random() < table.push[mine, starting_hand_index(player.cards)]:
+                return Decision(ALL_IN if ALL_IN in request.options else CALL)
+            return Decision(FOLD)
+        if len(pushers) > 1:
+            return Decision(FOLD)  # Overcalls are outside the charts
+        pusher = position[pushers[0]]
+        if pusher >= mine:
+            return Decision(FOLD)  # Re-pushed after acting, outside the charts
+        if self.rng.random() < table.call[pusher, mine, starting_hand_index(player.cards)]:
+            return Decision(ALL_IN if ALL_IN in request.options and not players[pushers[0]].all_in else CALL)
+        return Decision(FOLD)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve push/fold equilibrium charts.")
+    parser.add_argument("--build-equity", action="store_true", help="enumerate the all-in equity matrix first")
+    parser.add_argument("--players", type=int, nargs="+", default=list(range(2, 11)))
+    parser.add_argument("--stacks", type=int, nargs="+", default=list(CHART_STACKS))
+    parser.add_argument("--save", action="store_true", help=f"write the charts to {CHARTS_PATH}")
+    parser.add_argument("--show", action="store_true", help="print the push chart of every position")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="chips per hand to solve each chart to")
+    arguments = parser.parse_args()
+
+    if arguments.build_equity:
+        np.save(EQUITY_PATH, build_equity())
+        print(f"All-in equity matrix written to {EQUITY_PATH}")
+    charts = []
+    for players in arguments.players:
+        for stack in arguments.stacks:
+            charts.append(solve(players, stack, tolerance=arguments.tolerance))
+            exploitability = charts[-1].exploitability
+            print(f"{players} players, {stack} chips: exploitability {exploitability:.5f} chips/hand"
+                  + (" (tolerance not reached)" if exploitability >= arguments.tolerance else ""))
+            if arguments.show:
+                for position in range(players - 1):
+                    print(f"Push from position {position}")
+                    print(chart_grid(charts[-1].push[position]))
+    if arguments.save:
+        save_charts(charts)
+        print(f"Charts written to {CHARTS_PATH}")
@@ -0,0 +1,255 @@
+"""Weighted hand ranges in standard notation and range-versus-range equity."""
+import argparse
+import random
+from itertools import combinations
+from math import comb
+from typing import NamedTuple
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from cards import SUIT_TEXT, VALUE_TEXT, card_index, cards_to_mask, index_card, parse_card
+from preflop_table import load_table
+
+MAX_RUNOUTS = 2000  # Boards enumerated before runouts are sampled instead; a flop has 1176
+CHUNK_ROWS = 1 << 18  # Hands evaluated per evaluate_batch call
+
+# Every two-card combo as (lower card index, higher card index)
+ALL_COMBOS = list(combinations(range(52), 2))
+
+
+class RangeEquity(NamedTuple):
+    """Equity of a range against another, overall and per combo."""
+    equity: float  # Expected pot share of the first range
+    runouts: int  # Boards evaluated
+    exact: bool  # Whether every board was enumerated rather than sampled
+    combos: list[str]  # Combos of the first range, such as "AsKs"
+    combo_equity: np.ndarray  # Equity of each combo against the whole second range
+    combo_weight: np.ndarray  # Weight of each combo in the first range
+
+
+def combo_label(combo: tuple[int, int]) -> str:
+    """Return the text of a combo, higher card first, such as "AsKs"."""
+    return "".join(VALUE_TEXT[value] + SUIT_TEXT[suit]
+                   for value, suit in sorted(map(index_card, combo), reverse=True))
+
+
+def hand_combos(high: int, low: int, kind: str) -> list[tuple[int, int]]:
+    """Return the combos of two values: kind is "s" for suited, "o" for offsuit, "" for both."""
+    combos = []
+    for high_suit in range(1, 5):
+        for low_suit in range(1, 5):
+            if high == low and low_suit <= high_suit:
+                continue  # Each pair combo once
+            if kind == "s" and high_suit != low_suit or kind == "o" and high_suit == low_suit:
+                continue
+            combos.append(tuple(sorted((card_index((high, high_suit)), card_index((low, low_suit))))))
+    return combos
+
+
+def top_percent(percent: float) -> list[tuple[int, int]]:
+    """Return the combos of the strongest starting hands making up a share of all combos.
+
+    Starting hands are ranked by their heads-up preflop equity and taken
+    whole, so the share is rounded to the nearest hand: the next hand is
+    taken unless more than half of its combos would fall past the share.
+    """
+    equity = load_table()[:, 0]
+    target = percent / 100 * len(ALL_COMBOS)
+    combos = []
+    for index in np.argsort(-equity, kind="stable"):
+        row, column = divmod(int(index), 13)
+        high, low = 14 - min(row, column), 14 - max(row, column)
+        hand = hand_combos(high, low, "" if row == column else "s" if row < column else "o")
+        if len(combos) + len(hand) / 2 > target:
+            break
+        combos += hand
+    return combos
+
+
+def value_of(character: str) -> int:
+    """Return the card value of a value character."""
+    if character.upper() not in VALUE_TEXT[2:]:
+        raise ValueError(f"Unknown card value {character!r}")
+    return VALUE_TEXT.index(character.upper())
+
+
+def parse_hand(text: str) -> list[tuple[int, int]]:
+    """Return the combos of one range token without weight, such as "TT+", "A2s-A5s" or "AsKs"."""
+    if len(text) == 4 and text[1] in SUIT_TEXT[1:] and text[3] in SUIT_TEXT[1:]:
+        first, second = card_index(parse_card(text[:2])), card_index(parse_card(text[2:]))
+        if first == second:
+            raise ValueError(f"Combo {text!r} repeats a card")
+        return [tuple(sorted((first, second)))]
+    if text.endswith("%"):
+        return top_percent(float(text[:-1]))
+
+    if "-" in text:
+        start, end = text.split("-")
+        first, last = parse_hand_class(start), parse_hand_class(end)
+        if first[2] != last[2] or (first[0] == first[1]) != (last[0] == last[1]) or (
+                first[0] != first[1] and first[0] != last[0]):
+            raise ValueError(f"Cannot read the range {text!r}")
+        if first[0] == first[1]:  # Pairs such as 22-55
+            values = range(min(first[0], last[0]), max(first[0], last[0]) + 1)
+            return [combo for value in values for combo in hand_combos(value, value, "")]
+        kickers = range(min(first[1], last[1]), max(first[1], last[1]) + 1)  # Such as A2s-A5s
+        return [combo for kicker in kickers for combo in hand_combos(first[0], kicker, first[2])]
+
+    plus = text.endswith("+")
+    high, low, kind = parse_hand_class(text[:-1] if plus else text)
+    if not plus:
+        return hand_combos(high, low, kind)
+    if high == low:  # Pairs such as TT+
+        return [combo for value in range(high, 15) for combo in hand_combos(value, value, "")]
+    return [combo for kicker in range(low, high) for combo in hand_combos(high, kicker, kind)]
+
+
+def parse_hand_class(text: str) -> tuple[int, int, str]:
+    """Return the high value, low value and kind of a hand class such as "AKs", "TT" or "KQ"."""
+    if len(text) not in (2, 3) or len(text) == 3 and text[2] not in "so":
+        raise ValueError(f"Cannot read the hand {text!r}")
+    high, low = sorted((value_of(text[0]), value_of(text[1])), reverse=True)
+    kind = text[2] if len(text) == 3 else ""
+    if high == low and kind:
+        raise ValueError(f"A pair cannot be {'suited' if kind == 's' else 'offsuit'}")
+    return high, low, kind
+
+
+def parse_range(text: str) -> dict[tuple[int, int], float]:
+    """Return the weighted combos of a range such as "TT+, AKs, A5s-A2s:0.5, 15%".
+
+    Tokens are separated by commas and take an optional ":weight" from 0 to
+    1. A later token overrides the weight of combos listed earlier.
+    """
+    weights = {}
+    for token in text.replace(" ", "").split(","):
+        if not token:
+            continue
+        hand, _, weight = token.partition(":")
+        weight = float(weight) if weight else 1.0
+        if not 0 <= weight <= 1:
+            raise ValueError(f"Weight of {token!r} must be between 0 and 1")
+        for combo in parse_hand(hand):
+            weights[combo] = weight
+    return {combo: weight for combo, weight in weights.items() if weight > 0}
+
+
+def remove_blocked(weights: dict, dead: int) -> dict[tuple[int, int], float]:
+    """Return the combos of a range holding none of the cards in a dead card mask."""
+    return {combo: weight for combo, weight in weights.items()
+            if not (dead >> combo[0] & 1 or dead >> combo[1] & 1)}
+
+
+def board_runouts(board: list[int], max_runouts: int, seed: int) -> tuple[np.ndarray, bool]:
+    """Return the (R, k) cards completing the board and whether they are every completion."""
+    deck = [index for index in range(52) if index not in board]
+    missing = 5 - len(board)
+    if comb(len(deck), missing) <= max_runouts:
+        completions = list(combinations(deck, missing))
+        return np.array(completions, dtype=np.uint8).reshape(len(completions), missing), True
+    rng = random.Random(seed)
+    return np.array([rng.sample(deck, missing) for _ in range(max_runouts)], dtype=np.uint8), False
+
+
+def range_equity(hero: dict, villain: dict, community_card=frozenset(),
+                 max_runouts: int = MAX_RUNOUTS, seed: int = 0) -> RangeEquity:
+    """Return the equity of one weighted range against another on a board.
+
+    Every combo of both ranges is evaluated on each runout in one batch.
+    Hero combos are then scored against the whole villain range at once:
+    villain weight is cumulated by strength rank, once in total and once
+    per card, so the combos sharing a card with the hero combo can be
+    subtracted without comparing every pair. Boards with more completions
+    than max_runouts are sampled with the seed.
+    """
+    board = [card_index(card) for card in community_card]
+    if len(board) > 5 or len(set(board)) != len(board):
+        raise ValueError("The board holds at most 5 distinct community cards")
+    hero = remove_blocked(hero, cards_to_mask(community_card))
+    villain = remove_blocked(villain, cards_to_mask(community_card))
+    if not hero or not villain:
+        raise ValueError("Both ranges need a combo the board does not block")
+
+    combos = sorted(set(hero) | set(villain))  # Each combo is evaluated once
+    position = {combo: row for row, combo in enumerate(combos)}
+    pairs = np.array(combos, dtype=np.int64)
+    hero_rows = np.array([position[combo] for combo in hero])
+    hero_weight = np.array(list(hero.values()))
+    villain_weight = np.zeros(len(combos))  # Villain weight of every evaluated combo
+    villain_weight[[position[combo] for combo in villain]] = list(villain.values())
+    hero_pairs = pairs[hero_rows]
+
+    runouts, exact = board_runouts(board, max_runouts, seed)
+    wins = np.zeros(len(hero))
+    ties = np.zeros(len(hero))
+    matchups = np.zeros(len(hero))  # Villain weight met by each hero combo over every runout
+    per_chunk = max(1, CHUNK_ROWS // len(combos))
+    for start in range(0, len(runouts), per_chunk):
+        chunk = runouts[start:start + per_chunk]
+        dead = np.zeros((len(chunk), 52), dtype=bool)  # Board and runout cards
+        dead[:, board] = True
+        dead[np.arange(len(chunk))[:, None], chunk] = True
+        blocked = dead[:, pairs[:, 0]] | dead[:, pairs[:, 1]]  # Combos each runout blocks
+        # Blocked combos are scored on two spare cards so every row holds distinct cards
+        spare = np.argsort(dead, axis=1, kind="stable")[:, :2]
+        holes = np.where(blocked[:, :, None], spare[:, None, :], pairs[None, :, :])
+        cards = np.concatenate([
+            np.broadcast_to(np.array(board, dtype=np.int64), (len(chunk), len(combos), len(board))),
+            np.broadcast_to(chunk[:, None, :].astype(np.int64), (len(chunk), len(combos), chunk.shape[1])),
+            holes], axis=2)
+        strengths = evaluate_batch(cards.reshape(-1, 7)).reshape(len(chunk), len(combos))
+
+        for blocked_row, strength in zip(blocked, strengths):
+            live = ~blocked_row
+            weight = villain_weight * live
+            _, rank = np.unique(strength, return_inverse=True)
+            ranks = rank.max() + 1
+
+            # Villain weight per strength rank, in total and per card held
+            by_rank = np.bincount(rank, weight, ranks)
+            by_card = np.bincount(np.concatenate([pairs[:, 0] * ranks + rank, pairs[:, 1] * ranks + rank]),
+                                  np.concatenate([weight, weight]), 52 * ranks).reshape(52, ranks)
+            below = np.cumsum(by_rank) - by_rank  # Weight of strictly weaker villain combos
+            card_below = np.cumsum(by_card, axis=1) - by_card
+            card_total = by_card.sum(axis=1)
+
+            hero_rank = rank[hero_rows]
+            first, second = hero_pairs[:, 0], hero_pairs[:, 1]
+            same = weight[hero_rows]  # The hero's own combo, subtracted twice below
+            hero_live = live[hero_rows]
+            wins += hero_live * (below[hero_rank] - card_below[first, hero_rank]
+                                 - card_below[second, hero_rank])
+            ties += hero_live * (by_rank[hero_rank] - by_card[first, hero_rank]
+                                 - by_card[second, hero_rank] + same)
+            matchups += hero_live * (weight.sum() - card_total[first] - card_total[second] + same)
+
+    share = wins + ties / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        combo_equity = share / matchups
+    return RangeEquity(
+        equity=float((hero_weight * share).sum() / (hero_weight * matchups).sum()),
+        runouts=len(runouts),
+        exact=exact,
+        combos=[combo_label(combo) for combo in hero],
+        combo_equity=combo_equity,
+        combo_weight=hero_weight)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Equity of one hand range against another.")
+    parser.add_argument("hero", help='range such as "15%" or "TT+,AKs,A5s-A2s:0.5"')
+    parser.add_argument("villain", help="range of the opponent")
+    parser.add_argument("--board", default="", help='community cards such as "Ah Kd 2c"')
+    parser.add_argument("--max-runouts", type=int, default=MAX_RUNOUTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="combos to list, best first")
+    arguments = parser.parse_args()
+
+    community_card = {parse_card(text) for text in arguments.board.split()}
+    result = range_equity(parse_range(arguments.hero), parse_range(arguments.villain),
+                          community_card, arguments.max_runouts, arguments.seed)
+    method = "every runout" if result.exact else "sampled runouts"
+    print(f"Equity {result.equity:.2%} over {result.runouts} {method}")
+    for row in np.argsort(-result.combo_equity)[:arguments.top]:
+        print(f"{result.combos[row]}: {result.combo_equity[row]:.2%}")
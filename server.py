@@ -0,0 +1,243 @@
+"""Asyncio poker server running many tables in one process over a line protocol.
+
+Clients connect over TCP and send one line per message:
+
+    JOIN <name>                     take a seat at the next table to fill
+    CHECK | CALL | FOLD | ALL_IN    answer an ACT prompt
+    BET <total> | RAISE <total>
+
+The server sends SEATED, CARDS, BOARD, ACTION, SHOW, WIN, STACKS, BUST,
+ACT, ERROR, TIMEOUT and END lines, writing ALL IN as ALL_IN. An ACT line
+lists the legal actions, the round bet, the minimum raise, the total pot
+and the player's bet and balance. A player who does not answer within the
+timeout checks if possible and folds otherwise.
+"""
+import argparse
+import asyncio
+
+from cards import SUIT_TEXT, VALUE_TEXT, Deck
+from poker import (ALL_IN, BET, CALL, CHECK, FOLD, RAISE, ActionRequest, Decision,
+                   PlayerGroup, check_decision, hand)
+
+
+def card_text(cards) -> str:
+    """Return cards in short form such as 'Ah Td', highest first."""
+    return " ".join(VALUE_TEXT[value] + SUIT_TEXT[suit] for value, suit in sorted(cards, reverse=True))
+
+
+def parse_decision(line: str) -> Decision:
+    """Return the decision of a client line, raising ValueError if it is malformed."""
+    words = line.upper().split()
+    if words in (["ALL", "IN"], ["ALL_IN"]):
+        return Decision(ALL_IN)
+    if len(words) == 2 and words[0] in (BET, RAISE) and words[1].isdigit():
+        return Decision(words[0], int(words[1]))
+    if len(words) == 1 and words[0] in (CHECK, CALL, FOLD):
+        return Decision(words[0])
+    raise ValueError(f"Cannot read the action {line.strip()!r}")
+
+
+def default_decision(request: ActionRequest) -> Decision:
+    """Return the decision taken for a player who does not answer in time."""
+    return Decision(CHECK if CHECK in request.options else FOLD)
+
+
+class Seat:
+    """Connection of one player and the lines it has sent."""
+
+    def __init__(self, name: str, writer: asyncio.StreamWriter) -> None:
+        """Initialize the seat of a connected player."""
+        self.name = name
+        self.writer = writer
+        self.lines = asyncio.Queue()  # Lines received and not yet read
+        self.connected = True
+
+    def send(self, line: str) -> None:
+        """Queue one line for the player; drain waits until the network takes it."""
+        if self.connected:
+            self.writer.write(line.encode() + b"\n")
+
+    async def drain(self, timeout: float) -> None:
+        """Wait for the queued lines to be sent, dropping a player too slow to read them."""
+        if not self.connected:
+            return
+        try:
+            await asyncio.wait_for(self.writer.drain(), timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.close()  # Later decisions take the default action
+
+    def close(self) -> None:
+        """Close the player's connection."""
+        self.connected = False
+        self.writer.close()
+
+
+class Table:
+    """One table of seats playing hands until a single player is left."""
+
+    def __init__(self, number: int, seats: list[Seat], balance: int, timeout: float, max_hands: int) -> None:
+        """Initialize the table with its own players, deck and button."""
+        self.number = number
+        self.players = PlayerGroup(len(seats), balance, [seat.name for seat in seats])
+        self.seats = {player.id: seat for player, seat in zip(self.players, seats)}
+        self.seated = list(self.players)  # Every player dealt in, busted ones included
+        self.seat_number = {player.id: index for index, player in enumerate(self.players)}
+        self.deck = Deck()  # Shuffled again as it deals each hand
+        self.timeout = timeout  # Seconds each player has to act
+        self.max_hands = max_hands
+        self.hands = 0  # Hands played so far
+
+    def broadcast(self, line: str) -> None:
+        """Send a line to every seat at the table."""
+        for seat in self.seats.values():
+            seat.send(line)
+
+    async def flush(self) -> None:
+        """Wait until every seat's queued lines are sent, so a slow reader holds back its table."""
+        await asyncio.gather(*(seat.drain(self.timeout) for seat in self.seats.values()))
+
+    def sink(self, event: str, **fields) -> None:
+        """Turn a game event into protocol lines for the seats."""
+        if event == "deal":
+            for player in fields["players"]:
+                self.seats[player.id].send(f"CARDS {card_text(player.cards)}")  # Private
+        elif event == "board":
+            self.broadcast(f"BOARD {card_text(fields['community_card'])}")
+        elif event == "action":
+            self.broadcast(f"ACTION {self.seat_number[fields['player'].id]} "
+                           f"{fields['action'].replace(' ', '_')} {fields['amount']}")
+        elif event == "showdown":
+            live = fields["players"].all_fold()
+            if len(live) > 1:  # Cards are only shown when the pot is contested
+                for player in live:
+                    self.broadcast(f"SHOW {self.seat_number[player.id]} {player.score} "
+                                   f"{card_text(player.cards)}")
+        elif event == "pot_win":
+            self.broadcast(f"WIN {self.seat_number[fields['player'].id]} {fields['amount']}")
+        elif event == "leaderboard":
+            self.broadcast("STACKS " + " ".join(str(player.balance) for player in self.seated))
+        elif event == "lose":
+            self.broadcast(f"BUST {self.seat_number[fields['player'].id]}")
+
+    async def ask(self, request: ActionRequest) -> Decision:
+        """Prompt the player to act and wait for a legal decision until the timeout."""
+        seat = self.seats[request.player.id]
+        player = request.player
+        while not seat.lines.empty():
+            seat.lines.get_nowait()  # Drop lines sent out of turn
+        options = ",".join(option.replace(" ", "_") for option in request.options)
+        seat.send(f"ACT {options} {request.round_bet} {request.minimum_raise} "
+                  f"{request.total_pot} {player.bet} {player.balance}")
+        await self.flush()  # The prompt and every event since the last one
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        while seat.connected:
+            try:
+                line = await asyncio.wait_for(seat.lines.get(), deadline - asyncio.get_running_loop().time())
+            except asyncio.TimeoutError:
+                seat.send("TIMEOUT")
+                break
+            if line is None:
+                break  # Disconnected
+            try:
+                decision = parse_decision(line)
+                check_decision(player, request.preflop, request.round_bet, decision)
+                return decision
+            except ValueError as error:
+                seat.send(f"ERROR {error}")  # Ask again within the same deadline
+        return default_decision(request)
+
+    async def play(self) -> None:
+        """Play hands until one player is left, the hand limit or every seat leaves."""
+        for index, seat in enumerate(self.seats.values()):
+            seat.send(f"SEATED {self.number} {index} {len(self.seats)}")
+        button = 0
+        while self.hands < self.max_hands:
+            steps = hand(self.players, button, self.deck, self.sink)
+            try:
+                request = next(steps)  # First decision of the hand
+                while True:
+                    request = steps.send(await self.ask(request))
+            except StopIteration:
+                self.hands += 1  # The hand is over
+
+            self.players.update_status(self.sink)  # Announce busted players
+            await self.flush()
+            for player in list(self.players):
+                if player.lose:
+                    self.players.remove(player)
+            if len(self.players) < 2 or not any(
+                    self.seats[player.id].connected for player in self.players):
+                break
+            button = (button + 1) % len(self.players)
+            await asyncio.sleep(0)  # Let other tables run even if nobody here is connected
+        self.broadcast("END")
+        await self.flush()
+        for seat in self.seats.values():
+            seat.close()
+
+
+class TableServer:
+    """Seats joining players in arrival order and runs each full table as a task."""
+
+    def __init__(self, seats: int = 6, balance: int = 100, timeout: float = 30.0, max_hands: int = 1000) -> None:
+        """Initialize the server with the table size and the rules of every table."""
+        if not 2 <= seats <= 10:
+            raise ValueError("A table seats 2 to 10 players")
+        self.table_size = seats
+        self.balance = balance
+        self.timeout = timeout
+        self.max_hands = max_hands
+        self.waiting = []  # Seats joined but not yet at a table
+        self.tables = set()  # Tasks of the tables in play
+        self.table_count = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection: seat the player, then queue every line it sends."""
+        words = (await reader.readline()).decode().split(maxsplit=1)
+        if len(words) != 2 or words[0].upper() != "JOIN":
+            writer.write(b"ERROR Expected JOIN <name>\n")
+            writer.close()
+            return
+        seat = Seat(words[1].strip(), writer)
+        self.waiting.append(seat)
+        if len(self.waiting) >= self.table_size:
+            self.start_table()
+        try:
+            while line := await reader.readline():
+                seat.lines.put_nowait(line.decode())
+        except ConnectionError:
+            pass  # A reset connection is a disconnect
+        seat.connected = False  # Remaining decisions take the default action
+        seat.lines.put_nowait(None)
+        if seat in self.waiting:
+            self.waiting.remove(seat)
+
+    def start_table(self) -> None:
+        """Start a table with the players who waited longest."""
+        seats, self.waiting = self.waiting[:self.table_size], self.waiting[self.table_size:]
+        self.table_count += 1
+        table = Table(self.table_count, seats, self.balance, self.timeout, self.max_hands)
+        task = asyncio.create_task(table.play())
+        self.tables.add(task)  # Keep a reference until the table ends
+        task.add_done_callback(self.tables.discard)
+
+    async def serve(self, host: str, port: int) -> None:
+        """Accept connections until the process is stopped."""
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the multi-table poker server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--seats", type=int, default=6, help="players per table")
+    parser.add_argument("--balance", type=int, default=100, help="starting balance of every player")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds each player has to act")
+    parser.add_argument("--max-hands", type=int, default=1000, help="hands per table before it closes")
+    arguments = parser.parse_args()
+
+    table_server = TableServer(arguments.seats, arguments.balance, arguments.timeout, arguments.max_hands)
+    print(f"Serving on {arguments.host}:{arguments.port}")
+    asyncio.run(table_server.serve(arguments.host, arguments.port))
@@ -0,0 +1,221 @@
+"""Bot-versus-bot matches spread over a process pool, reporting chip EV per strategy."""
+import argparse
+import functools
+import importlib
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+from typing import NamedTuple
+
+import numpy as np
+
+from cards import Deck
+from ismcts import ISMCTSStrategy
+from poker import PassiveStrategy, PlayerGroup, RandomStrategy, console_sink, no_sink, play_hand
+from pushfold import PushFoldStrategy
+
+ISMCTS_ITERATIONS = 300  # Playouts per ISMCTS decision: a count, not a time budget, so hands replay exactly
+
+# Strategies known by a short name; any other name is read as "module:Class"
+STRATEGIES = {"passive": PassiveStrategy, "random": RandomStrategy, "pushfold": PushFoldStrategy,
+              "ismcts": functools.partial(ISMCTSStrategy, budget=None, iterations=ISMCTS_ITERATIONS)}
+
+HAND_BITS = 20  # Hand numbers per match; a hand's seed is its match seed then its number
+
+
+class ChipEV(NamedTuple):
+    """Chips won per hand by one strategy with a confidence interval."""
+    hands: int  # Hands the strategy was dealt into
+    ev: float  # Mean chips won per hand
+    interval: tuple[float, float]
+
+
+def load_strategy(name: str):
+    """Return a new strategy from its short name or its "module:Class" path."""
+    if name in STRATEGIES:
+        return STRATEGIES[name]()
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown strategy {name!r}")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+def hand_seed(match_seed: int, hand_number: int) -> int:
+    """Return the seed of one hand, which fixes its deal and every bot's choices."""
+    return match_seed << HAND_BITS | hand_number
+
+
+def seat_order(names: list[str], match: int) -> list[str]:
+    """Return the strategy of every seat, rotated one seat per match for fairness."""
+    shift = match % len(names)
+    return names[shift:] + names[:shift]
+
+
+def play_seeded_hand(players: PlayerGroup, seat: dict, strategies: dict, deck: Deck, button: int,
+                     seed: int, sink=no_sink) -> None:
+    """Play one hand after reseeding the deck and every bot's RNG from the hand's seed."""
+    deck.reset(seed)
+    for player_id, strategy in strategies.items():
+        if hasattr(strategy, "rng"):
+            strategy.rng.seed(seed * 16 + seat[player_id])  # Independent stream per seat
+    play_hand(players, button, strategies, sink, deck)
+
+
+def play_match(names: list[str], match: int, match_seed: int, balance: int, max_hands: int):
+    """Generator playing one match and yielding a summary row per hand.
+
+    Each row holds the match and hand numbers, the button, every seat's
+    balance before the hand (0 once eliminated) and every seat's chips won
+    or lost. The deck and each bot's RNG are reseeded from the hand's seed,
+    so replay_hand can play any hand again from its row alone.
+    """
+    seats = seat_order(names, match)
+    players = PlayerGroup(len(seats), balance)
+    seat = {player.id: index for index, player in enumerate(players)}
+    strategies = {player.id: load_strategy(name) for player, name in zip(players, seats)}
+    deck = Deck()
+    button = 0
+    for hand_number in range(min(max_hands, 1 << HAND_BITS)):
+        before = [0] * len(seats)
+        for player in players:
+            before[seat[player.id]] = player.balance
+        play_seeded_hand(players, seat, strategies, deck, button, hand_seed(match_seed, hand_number))
+        after = [0] * len(seats)
+        for player in players:
+            after[seat[player.id]] = player.balance
+        yield [match, hand_number, button] + before + [new - old for new, old in zip(after, before)]
+
+        players.update_status()  # Mark players who can no longer pay the blinds
+        for player in list(players):
+            if player.lose:
+                players.remove(player)
+        if len(players) < 2:
+            return
+        button = (button + 1) % len(players)  # Move the button as game() does
+
+
+def play_shard(names: list[str], matches: list[tuple[int, int]], balance: int, max_hands: int) -> np.ndarray:
+    """Play a block of (match, seed) pairs and return their summary rows as one array."""
+    rows = [row for match, match_seed in matches
+            for row in play_match(names, match, match_seed, balance, max_hands)]
+    return np.array(rows, dtype=np.int64).reshape(-1, 3 + 2 * len(names))
+
+
+def match_seeds(seed: int | None, matches: int) -> list[int]:
+    """Return an independent seed for every match, all drawn from one master seed."""
+    master = random.Random(seed)
+    return [master.getrandbits(32) for _ in range(matches)]
+
+
+def run_matches(names: list[str], matches: int, balance: int = 100, max_hands: int = 1000,
+                seed: int | None = None, workers: int | None = None, shard_size: int = 10):
+    """Generator yielding the summary rows of every shard as soon as it finishes.
+
+    Matches are split into shards of shard_size and played in a process
+    pool of the given number of workers (None uses every core).
+    """
+    if len(names) < 2 or len(names) > 10:
+        raise ValueError("A match seats 2 to 10 strategies")
+    for name in names:
+        load_strategy(name)  # Fail early on an unknown strategy
+    pairs = list(enumerate(match_seeds(seed, matches)))
+    shards = [pairs[start:start + shard_size] for start in range(0, matches, shard_size)]
+    if workers == 1:
+        for shard in shards:
+            yield play_shard(names, shard, balance, max_hands)  # Skip pool start-up cost
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_shard, names, shard, balance, max_hands) for shard in shards]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def chip_ev(names: list[str], summaries, confidence: float = 0.95) -> dict[str, ChipEV]:
+    """Return the chip EV of every strategy from a stream of summary arrays.
+
+    Only whole-chip sums are kept, so the result does not depend on the
+    order in which shards finish.
+    """
+    seats = len(names)
+    totals = {name: [0, 0, 0] for name in names}  # Hands, chips and squared chips
+    for rows in summaries:
+        for shift in range(seats):
+            block = rows[rows[:, 0] % seats == shift]  # Matches with the same seat order
+            for index, name in enumerate(seat_order(names, shift)):
+                dealt = block[:, 3 + index] > 0
+                delta = block[dealt, 3 + seats + index]
+                totals[name][0] += int(dealt.sum())
+                totals[name][1] += int(delta.sum())
+                totals[name][2] += int((delta * delta).sum())
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)  # Two-sided critical value
+    result = {}
+    for name, (hands, chips, squares) in totals.items():
+        if not hands:
+            result[name] = ChipEV(0, 0.0, (0.0, 0.0))
+            continue
+        mean = chips / hands
+        variance = max(squares / hands - mean * mean, 0.0) * hands / max(hands - 1, 1)
+        margin = z * (variance / hands) ** 0.5
+        result[name] = ChipEV(hands, mean, (mean - margin, mean + margin))
+    return result
+
+
+def find_row(rows: np.ndarray, match: int, hand_number: int) -> list[int]:
+    """Return the summary row of one hand from an array of summary rows."""
+    found = rows[(rows[:, 0] == match) & (rows[:, 1] == hand_number)]
+    if not len(found):
+        raise ValueError(f"Match {match} has no hand {hand_number}")
+    return found[0].tolist()
+
+
+def replay_hand(names: list[str], seed: int | None, row: list[int], sink=console_sink) -> list[int]:
+    """Play the hand of one summary row of a tournament again, showing it to sink.
+
+    The row's button and balances rebuild the table as it was, so only that
+    hand is played. Returns the row the hand gives again.
+    """
+    match, hand_number, button = row[:3]
+    seats = seat_order(names, match)
+    before = row[3:3 + len(seats)]
+    players = PlayerGroup(len(seats), 0)
+    seat = {player.id: index for index, player in enumerate(players)}
+    for player in list(players):
+        player.balance = before[seat[player.id]]
+        if not player.balance:
+            players.remove(player)  # Eliminated before this hand
+    strategies = {player.id: load_strategy(seats[seat[player.id]]) for player in players}
+    match_seed = match_seeds(seed, match + 1)[match]
+    play_seeded_hand(players, seat, strategies, Deck(), button, hand_seed(match_seed, hand_number), sink)
+    after = [0] * len(seats)
+    for player in players:
+        after[seat[player.id]] = player.balance
+    return [match, hand_number, button] + before + [new - old for new, old in zip(after, before)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play bots against each other and report chip EV.")
+    parser.add_argument("strategies", nargs="+", help="strategy names or module:Class paths, one per seat")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--balance", type=int, default=100, help="starting balance of every seat")
+    parser.add_argument("--max-hands", type=int, default=1000, help="hands before a match stops")
+    parser.add_argument("--seed", type=int, default=0, help="master seed of the tournament")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core)")
+    parser.add_argument("--replay", type=int, nargs=2, metavar=("MATCH", "HAND"),
+                        help="show one hand of the tournament saved in --rows instead of running it")
+    parser.add_argument("--rows", help="save the summary rows to this .npy file, or read them for --replay")
+    arguments = parser.parse_args()
+
+    if arguments.replay:
+        if not arguments.rows:
+            parser.error("--replay needs the --rows file saved when the tournament ran")
+        replay_hand(arguments.strategies, arguments.seed, find_row(np.load(arguments.rows), *arguments.replay))
+    else:
+        summaries = run_matches(arguments.strategies, arguments.matches, arguments.balance,
+                                arguments.max_hands, arguments.seed, arguments.workers)
+        if arguments.rows:
+            summaries = list(summaries)
+            np.save(arguments.rows, np.concatenate(summaries))
+        results = chip_ev(arguments.strategies, summaries)
+        for strategy, (hands, ev, (low, high)) in results.items():
+            print(f"{strategy}: {ev:+.3f} chips/hand over {hands} hands (95% CI {low:+.3f} to {high:+.3f})")